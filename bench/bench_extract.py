@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# EXTRACTION BENCHMARK: runs scrape_day's extraction step (extract_page on raw
+# page bytes, no network) over the checked-in fixture corpus, one page per
+# layout era, for every engine / window combination. Reports pages per second
+# and peak traced memory, and checks every result against its golden output.
+# Exits non-zero on any golden mismatch. The fixtures are synthetic (see
+# make_fixtures.py) and the goldens are the full-page soup engine's own output,
+# so this is a soup-vs-stream (and window-vs-full) consistency and regression
+# check, not a correctness check against the live site.
+#
+#   python bench/bench_extract.py                  # all combinations, 50 rounds
+#   python bench/bench_extract.py --engines stream --rounds 200
+#   python bench/bench_extract.py --update-golden  # after an intended rule change
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from hylee_extract import ENGINES, extract_page
+from hylee_shards import link_year
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+
+def load_fixtures():
+    fixtures = []
+    for filename in sorted(os.listdir(FIXTURE_DIR)):
+        if filename.endswith(".htm"):
+            with open(os.path.join(FIXTURE_DIR, filename), "rb") as f:
+                fixtures.append((filename[:-4], f.read()))
+    return fixtures
+
+
+def golden_path(name):
+    return os.path.join(FIXTURE_DIR, f"{name}.golden.json")
+
+
+def load_golden(name):
+    try:
+        with open(golden_path(name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except OSError:
+        return None
+
+
+def extract(name, content, engine, windowed):
+    return extract_page(content, True, engine, windowed, link_year(name))
+
+
+def measure(fixtures, engine, windowed, rounds):
+    # Warm-up pass also produces the outputs that are checked against the goldens
+    outputs = {name: extract(name, content, engine, windowed) for name, content in fixtures}
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name, content in fixtures:
+            extract(name, content, engine, windowed)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for name, content in fixtures:
+        extract(name, content, engine, windowed)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    pages = rounds * len(fixtures)
+    return outputs, pages / elapsed if elapsed else float("inf"), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hylee offline extraction benchmark")
+    parser.add_argument("--engines", default="all", help=f"Comma separated engines or all ({', '.join(ENGINES)})")
+    parser.add_argument("--rounds", type=int, default=50, help="Passes over the fixture corpus per combination")
+    parser.add_argument("--update-golden", action="store_true", help="Rewrite the golden outputs from the soup engine")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    if not fixtures:
+        print(f"No fixtures in {FIXTURE_DIR}. Run bench/make_fixtures.py first.")
+        sys.exit(1)
+
+    if args.update_golden:
+        for name, content in fixtures:
+            bullets = extract(name, content, "soup", False)
+            with open(golden_path(name), "w", encoding="utf-8") as f:
+                json.dump(bullets, f, ensure_ascii=False, indent=2)
+                f.write("\n")
+            print(f"golden  {name}: {len(bullets)} bullets")
+        return
+
+    engines = ENGINES if args.engines == "all" else [e.strip() for e in args.engines.split(",")]
+    total_kb = sum(len(content) for _, content in fixtures) / 1024
+    print(f"{len(fixtures)} fixture pages, {total_kb:.0f} KB, {args.rounds} rounds\n")
+    print(f"{'engine':<8} {'window':<7} {'pages/s':>9} {'MB/s':>7} {'peak KB':>9}  vs soup")
+
+    failures = []
+    for engine in engines:
+        for windowed in (True, False):
+            outputs, pps, peak = measure(fixtures, engine, windowed, max(1, args.rounds))
+            bad = [name for name, bullets in outputs.items() if bullets != load_golden(name)]
+            failures.extend(f"{engine}/{'window' if windowed else 'full'}: {name}" for name in bad)
+            mbps = pps * total_kb / len(fixtures) / 1024
+            status = "ok" if not bad else f"{len(bad)} MISMATCH"
+            print(f"{engine:<8} {'yes' if windowed else 'no':<7} {pps:9.0f} {mbps:7.1f} {peak / 1024:9.0f}  {status}")
+
+    if failures:
+        print("\nMismatches against the soup golden (consistency, not correctness):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
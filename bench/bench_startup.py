@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# STARTUP BENCHMARK: import time of the GUI module and time until the Tk window
+# has painted, each measured in a fresh interpreter. Exits non-zero when a
+# median goes over its budget or a heavy dependency is loaded before the first
+# fetch, so it can guard against regressions.
+#
+#   python bench/bench_startup.py                # 5 runs, default budgets
+#   python bench/bench_startup.py --runs 10 --max-paint-ms 400
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported until the first fetch / parse
+HEAVY_MODULES = ("requests", "bs4", "hylee_pipeline", "concurrent.futures.process")
+
+PROBE = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import hylee_gui
+t1 = time.perf_counter()
+result = {"import_ms": (t1 - t0) * 1000, "paint_ms": None}
+try:
+    root = hylee_gui.tk.Tk()
+except hylee_gui.tk.TclError as e:
+    result["error"] = str(e)
+else:
+    root.withdraw()
+    hylee_gui.HyleeGUI(root)
+    root.deiconify()
+    root.update() # First paint
+    result["paint_ms"] = (time.perf_counter() - t0) * 1000
+    root.destroy()
+result["heavy"] = [m for m in HEAVY if m in sys.modules]
+print(json.dumps(result))
+'''
+
+
+def run_probe():
+    code = f"HEAVY = {HEAVY_MODULES!r}\n" + PROBE
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip())
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hylee GUI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=150.0)
+    parser.add_argument("--max-paint-ms", type=float, default=600.0)
+    args = parser.parse_args()
+
+    results = [run_probe() for _ in range(max(1, args.runs))]
+    failures = []
+
+    import_ms = median([r["import_ms"] for r in results])
+    print(f"import hylee_gui : {import_ms:7.1f} ms (budget {args.max_import_ms:.0f} ms)")
+    if import_ms > args.max_import_ms:
+        failures.append("import time over budget")
+
+    paints = [r["paint_ms"] for r in results if r["paint_ms"] is not None]
+    if paints:
+        paint_ms = median(paints)
+        print(f"first paint      : {paint_ms:7.1f} ms (budget {args.max_paint_ms:.0f} ms)")
+        if paint_ms > args.max_paint_ms:
+            failures.append("first paint over budget")
+    else:
+        # Headless box: the import budget and module check still apply
+        print(f"first paint      :  skipped ({results[0].get('error', 'no display')})")
+
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    if heavy:
+        failures.append(f"loaded before the first fetch: {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import random
+
+# Regenerates the checked-in fixture corpus in bench/fixtures/. Each page stands
+# in for one layout era of hyena.cz: navigation chrome in front, the news block
+# after the odsud comment, and a long editorial tail the engines must not read.
+# Output is deterministic, so re-running it only changes files when this
+# script changes. After regenerating, refresh the goldens:
+#   python bench/make_fixtures.py && python bench/bench_extract.py --update-golden
+# These are synthetic stand-ins, not recorded pages. They mimic each era's
+# markup as far as the extraction rules see it, but real pages carry quirks
+# they do not, and they miss the /YY/MM/YYMMDDpes.html era entirely. The
+# goldens are the soup engine's own output, so they catch regressions and
+# engine disagreements, not rules that are wrong for the real site.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+WORDS = (
+    "vláda ministr prezident sněmovna zákon daně koruna euro praha brno ostrava policie soud "
+    "nemocnice škola studenti dálnice vlak letadlo počítač internet firma banka úvěr inflace "
+    "rozpočet senát volby strana opozice koalice hasiči povodně sníh mráz léto turisté hrad "
+    "zámek divadlo film hudba festival fotbal hokej olympiáda kraj obec starosta úřad stavba"
+).split()
+
+
+def sentence(rng, words=12):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:]
+
+
+def chrome(rng):
+    # Menu and archive links above the news, as on every era's page
+    links = "".join(f'<a href="/{rng.randint(3, 25):02d}0{rng.randint(1, 9)}1{rng.randint(0, 9)}pes.htm">{rng.choice(WORDS)}</a> | '
+                    for _ in range(60))
+    return ('<html><head><title>Hyena</title>\n'
+            '<script>var menu = "<li>nope</li>"; function go() { return 1 < 2; }</script>\n'
+            f'</head><body bgcolor="white">\n<table width="100%"><tr><td>{links}</td></tr></table>\n')
+
+
+def essay(rng, paragraphs=60):
+    # The editorial after the news: must never leak into bullets
+    return "".join(f"<p>{sentence(rng, 40)}. {sentence(rng, 30)}.</p>\n" for _ in range(paragraphs))
+
+
+def era_unclosed_li(rng):
+    # 2003-2006: unclosed <li> items, formatting tags inside, weather stop, konec comment
+    items = "".join(f"<li>{sentence(rng)} <b>{rng.choice(WORDS)}</b> {sentence(rng, 6)}\n" for _ in range(14))
+    return (chrome(rng) + "<!-- odsud -->\n<ul>\n" + items
+            + "<li>Počasí Praha: ráno mlha, odpoledne slunečno\n<li>Tohle už patří do komentáře\n</ul>\n"
+            + "<!-- konec -->\n" + essay(rng) + "</body></html>\n")
+
+
+def era_cp1250_br(rng):
+    # 2004-2005: <br> separated lines, entities, the debilní kill-switch footer
+    lines = "".join(f"{sentence(rng)}&nbsp;&quot;{rng.choice(WORDS)}&quot; &amp; {sentence(rng, 5)}<br>\n" for _ in range(16))
+    return (chrome(rng) + "<!-- odsud -->\n<font face=Arial>\n" + lines
+            + "Pokud vám nějaká zpráva přijde debilní, napište mi<br>\n" + "Po kill-switchi už nic<br>\n"
+            + "</font>\n" + essay(rng) + "</body></html>\n")
+
+
+def era_table_stop(rng):
+    # 2006-2007: <p> items, a facebook line that is dropped, news ends at a <table>
+    items = "".join(f"<p>{sentence(rng)} {sentence(rng, 8)}</p>\n" for _ in range(12))
+    return (chrome(rng) + "<!-- odsud -->\n" + items
+            + '<p>Sledujte nás na <a href="https://facebook.com/hyena">facebook.com/hyena</a></p>\n'
+            + "".join(f"<p>{sentence(rng)}</p>\n" for _ in range(4))
+            + "<table><tr><td>reklama</td></tr></table>\n" + essay(rng) + "</body></html>\n")
+
+
+def era_navy_font(rng):
+    # 2008-2011: the news is followed by a navy <font> heading of the next section
+    items = "".join(f"<li>{sentence(rng)}</li>\n" for _ in range(18))
+    return (chrome(rng) + "<!--odsud-->\n<ul>\n" + items + "</ul>\n"
+            + '<font color="navy" size=4><b>Komentář dne</b></font>\n' + essay(rng) + "</body></html>\n")
+
+
+def era_xxxxxxxx(rng):
+    # 2012-2016: an "xxxxxxxx odsud xxxxxxxx" anchor (not a stop) and an xxxxxxxx comment stop
+    items = "".join(f"<p>{sentence(rng)} <i>{rng.choice(WORDS)}</i></p>\n" for _ in range(15))
+    return (chrome(rng) + "<!-- xxxxxxxx odsud xxxxxxxx -->\n" + items
+            + "<!-- xxxxxxxx -->\n" + essay(rng) + "</body></html>\n")
+
+
+def era_utf8_div(rng):
+    # 2017-2021: utf-8, a <script> inside the news block, a <div> stop
+    items = "".join(f"<p>{sentence(rng)} {sentence(rng, 7)}</p>\n" for _ in range(16))
+    return (chrome(rng) + "<!-- odsud -->\n" + items[:len(items) // 2]
+            + "<script>document.write('<p>neni zprava</p>');</script>\n" + items[len(items) // 2:]
+            + '<div class="komentar">\n' + essay(rng) + "</div></body></html>\n")
+
+
+def era_utf8_modern(rng):
+    # 2022+: utf-8 <li> items, &amp; entities, a digineff line that is dropped, "Dnes" weather stop
+    items = "".join(f"<li>{sentence(rng)} &amp; {sentence(rng, 5)}</li>\n" for _ in range(20))
+    return (chrome(rng) + "<!-- odsud -->\n<ul>\n" + items
+            + '<li>Podpořte nás přes <a href="https://digineff.cz">digineff.cz</a></li>\n'
+            + "<li>Dnes zataženo, večer déšť</li>\n<li>Tohle už ne</li>\n</ul>\n"
+            + "<!-- konec -->\n" + essay(rng) + "</body></html>\n")
+
+
+def era_no_anchor(rng):
+    # A page without the odsud comment: nothing may be extracted
+    return chrome(rng) + "<ul>" + "".join(f"<li>{sentence(rng)}\n" for _ in range(10)) + "</ul>\n" + essay(rng) + "</body></html>\n"
+
+
+# name -> (builder, encoding). The YYMMDDpes prefix picks the rule era.
+FIXTURES = {
+    "030415pes-unclosed-li": (era_unclosed_li, "windows-1250"),
+    "041102pes-cp1250-br": (era_cp1250_br, "windows-1250"),
+    "060310pes-table-stop": (era_table_stop, "windows-1250"),
+    "070101pes-no-anchor": (era_no_anchor, "windows-1250"),
+    "080521pes-navy-font": (era_navy_font, "windows-1250"),
+    "120904pes-xxxxxxxx": (era_xxxxxxxx, "windows-1250"),
+    "190617pes-utf8-div": (era_utf8_div, "utf-8"),
+    "250102pes-utf8-modern": (era_utf8_modern, "utf-8"),
+}
+
+
+def main():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, (build, encoding) in FIXTURES.items():
+        page = build(random.Random(name))
+        with open(os.path.join(FIXTURE_DIR, f"{name}.htm"), "wb") as f:
+            f.write(page.encode(encoding))
+        print(f"{name}.htm  {len(page)} chars  ({encoding})")
+
+
+if __name__ == "__main__":
+    main()
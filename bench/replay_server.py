@@ -0,0 +1,243 @@
+import argparse
+import datetime
+import hashlib
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# REPLAY SERVER: a local stand-in for hyena.cz, so the crawler's concurrency,
+# retry and caching behaviour can be load-tested on any machine.
+# Serves every archive page of HyenaScraper.archive_map plus YYMMDDpes.htm
+# daily pages, either recorded (a corpus from `python hylee.py snapshot`) or
+# synthetic (the era layouts from bench/make_fixtures.py). Faults are injected
+# per request: latency and jitter, a bandwidth cap, 503s, 404s and stalls.
+#
+#   python bench/replay_server.py --port 8765 --latency 80 --error-rate 0.05
+#   python hylee.py --base-url http://127.0.0.1:8765 --years 2004 --no-cache
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from make_fixtures import (
+    era_unclosed_li, era_cp1250_br, era_table_stop, era_navy_font,
+    era_xxxxxxxx, era_utf8_div, era_utf8_modern
+)
+from hylee_core import HyenaScraper
+from hylee_corpus import Corpus
+from hylee_shards import DATE_RE
+
+
+def era_for(year):
+    # Synthetic layout and encoding of a year's daily pages
+    if year <= 2006:
+        return (era_unclosed_li, era_cp1250_br, era_table_stop)[year % 3], "windows-1250"
+    if year == 2007:
+        return era_table_stop, "windows-1250"
+    if year <= 2011:
+        return era_navy_font, "windows-1250"
+    if year <= 2016:
+        return era_xxxxxxxx, "windows-1250"
+    if year <= 2021:
+        return era_utf8_div, "utf-8"
+    return era_utf8_modern, "utf-8"
+
+
+def synthetic_days(year, limit=0):
+    # Workdays up to today, as "/YYMMDDpes.htm"
+    today = datetime.date.today()
+    day = datetime.date(year, 1, 1)
+    links = []
+    while day.year == year and day <= today:
+        if day.weekday() < 5:
+            links.append(f"/{day:%y%m%d}pes.htm")
+        day += datetime.timedelta(days=1)
+    return links[:limit] if limit else links
+
+
+class Site:
+    # Page source: recorded corpus when given, synthetic pages otherwise
+    def __init__(self, corpus=None, days=0, mixed=0.0):
+        self.corpus = Corpus(corpus) if corpus else None
+        self.mixed = mixed
+        self.archives = {}
+        for year, path in HyenaScraper().archive_map.items():
+            self.archives.setdefault(path, []).append(year)
+        self.links = {}
+        for years in self.archives.values():
+            for year in years:
+                self.links[year] = self.corpus.links({year}) if self.corpus else synthetic_days(year, days)
+        self.known = {link for links in self.links.values() for link in links}
+
+    def archive_page(self, path):
+        years = self.archives.get(path)
+        if years is None:
+            return None
+        rows = "".join(f'<a href="{link}">{link[5:7]}.{link[3:5]}.</a>\n'
+                       for year in sorted(years) for link in self.links[year])
+        return f"<html><body><!-- archiv -->\n{rows}</body></html>\n".encode("windows-1250")
+
+    def day_page(self, path):
+        if path not in self.known:
+            return None
+        if self.corpus:
+            return self.corpus.read(path)
+        year = 2000 + int(DATE_RE.search(path).group(1))
+        build, encoding = era_for(year)
+        rng = random.Random(path)
+        if self.mixed and rng.random() < self.mixed:
+            encoding = "utf-8" if encoding == "windows-1250" else "windows-1250"
+        return build(rng).encode(encoding, errors="replace")
+
+    def page(self, path):
+        if DATE_RE.search(path):
+            return self.day_page(path)
+        return self.archive_page(path)
+
+
+class Faults:
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=0.0, error_rate=0.0,
+                 not_found_rate=0.0, stall_rate=0.0, stall=15.0, seed=None):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.bandwidth = bandwidth * 1024 # bytes/s, 0 = unlimited
+        self.error_rate = error_rate
+        self.not_found_rate = not_found_rate
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self):
+        # One fault decision per request: "error", "missing", "stall" or None
+        with self.lock:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            roll = self.rng.random()
+        if roll < self.error_rate:
+            return delay, "error"
+        roll -= self.error_rate
+        if roll < self.not_found_rate:
+            return delay, "missing"
+        roll -= self.not_found_rate
+        if roll < self.stall_rate:
+            return delay, "stall"
+        return delay, None
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = {}
+        self.bytes = 0
+
+    def add(self, status, size=0):
+        with self.lock:
+            self.status[status] = self.status.get(status, 0) + 1
+            self.bytes += size
+
+    def line(self):
+        with self.lock:
+            codes = ", ".join(f"{code}: {n}" for code, n in sorted(self.status.items(), key=str))
+            return f"{sum(self.status.values())} requests ({codes}), {self.bytes / 1048576:.1f} MB sent"
+
+
+def make_handler(site, faults, stats, quiet=True):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            if not quiet:
+                super().log_message(fmt, *args)
+
+        def send_body(self, status, body, headers=()):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command == "HEAD":
+                return
+            if not faults.bandwidth:
+                self.wfile.write(body)
+            else:
+                chunk = 8192
+                for start in range(0, len(body), chunk):
+                    self.wfile.write(body[start:start + chunk])
+                    time.sleep(min(chunk, len(body) - start) / faults.bandwidth)
+            stats.add(status, len(body))
+
+        def do_GET(self):
+            delay, fault = faults.draw()
+            time.sleep(delay)
+            path = self.path.split("?", 1)[0]
+            if fault == "stall":
+                time.sleep(faults.stall)
+                stats.add("stall")
+                self.close_connection = True
+                return
+            if fault == "error":
+                return self.send_body(503, b"Service Unavailable")
+            body = None if fault == "missing" else site.page(path)
+            if body is None:
+                return self.send_body(404, b"Not Found")
+
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                stats.add(304)
+                return
+            # No charset on purpose: like the real site, clients must sniff the bytes
+            self.send_body(200, body, (("Content-Type", "text/html"), ("ETag", etag)))
+
+        do_HEAD = do_GET
+
+    return ReplayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local hyena.cz stand-in for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--corpus", default=None, help="Serve recorded pages from a snapshot corpus instead of synthetic ones")
+    parser.add_argument("--days", type=int, default=0, help="Synthetic workdays per year (default: 0, all of them)")
+    parser.add_argument("--mixed", type=float, default=0.0, help="Share of synthetic pages served in the other encoding")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency jitter in ms (uniform +/-)")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="Per-connection bandwidth cap in KB/s (default: unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--not-found-rate", type=float, default=0.0, help="Share of requests answered with 404")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Share of requests that hang, then drop the connection")
+    parser.add_argument("--stall", type=float, default=15.0, help="Seconds a stalled request hangs (default: 15)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible fault sequence")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    site = Site(args.corpus, args.days, args.mixed)
+    faults = Faults(args.latency, args.jitter, args.bandwidth, args.error_rate,
+                    args.not_found_rate, args.stall_rate, args.stall, args.seed)
+    stats = Stats()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(site, faults, stats, not args.verbose))
+    server.daemon_threads = True
+    source = args.corpus or "synthetic pages"
+    print(f"Replaying {len(site.known)} daily pages ({source}) on http://{args.host}:{args.port}")
+    print(f"Use: python hylee.py --base-url http://{args.host}:{args.port} ...  (Ctrl+C to stop)")
+    def _interrupt(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(stats.line())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,26 @@
-import requests
-from bs4 import BeautifulSoup, Comment
-import json
 import os
-import re
 import time
+import signal
 import logging
+import argparse
+from collections import deque
+
+from hylee_core import HyenaScraper
+from hylee_fetch import TokenBucket, RetryPolicy
+from hylee_corpus import CORPUS_FILE, write_corpus, reextract
+from hylee_publish import PUBLISH_DIR, publish, update_indexes
+from hylee_search import SearchIndex
+from hylee_watch import WATCH_STATE_FILE, LiveWatcher
+from hylee_metrics import metrics
+from hylee_events import EVENTS_FILE, LEVELS, events, read_events, query, slowest, format_event
+from hylee_store import STORES, DB_FILE, open_store, export_shards, import_shards
+from hylee_cache import PageCache
+from hylee_rules import load_rulebook
+from hylee_extract import ENGINES
+from hylee_shards import (
+    pending_links, merge_days, shard_filename, link_date, describe_diff,
+    ShardJournal, load_run_state, save_run_state, clear_run_state
+)
 
 # Configure logging: Errors go to both the console and a local .log file
 logging.basicConfig(
@@ -16,193 +32,61 @@ logging.basicConfig(
     ]
 )
 
-class HyenaScraper:
-    def __init__(self):
-        self.base_url = "https://hyena.cz"
-        self.headers = {'User-Agent': 'HyleeArchiver-CLI/2.2'}
-        
-        self.archive_map = {
-            2026: "/", 
-            2025: "/inc/archiv20.htm",
-            2024: "/inc/archiv19.htm",
-            2023: "/inc/archiv18.htm",
-            2022: "/inc/archiv17.htm",
-            2021: "/inc/archiv16.htm",
-            2020: "/inc/archiv15.htm",
-            2019: "/inc/archiv14.htm",
-            2018: "/inc/archiv13.htm",
-            2017: "/inc/archiv12.htm",
-            2016: "/archiv11.htm",
-            2015: "/archiv10.htm",
-            2014: "/archiv9.htm",
-            2013: "/archiv8.htm",
-            2012: "/archiv7.htm",
-            2011: "/archiv6.htm",
-            2010: "/archiv5.html",
-            2009: "/archiv4.html",
-            2008: "/archiv3.html",
-            2007: "/archiv2.html",
-            2006: "/archiv2.html",
-            2005: "/archiv1.html",
-            2004: "/archiv1.html",
-            2003: "/archiv1.html"
-        }
-
-    def sanitize_text(self, text):
-        text = re.sub(r'<[^>]*>', '', text)
-        text = text.replace('&nbsp;', ' ')
-        text = text.replace('&amp;', '&')
-        text = text.replace('&quot;', '"')
-        return " ".join(text.split())
-
-    def get_daily_links(self, year_full):
-        year_int = int(year_full)
-        archive_path = self.archive_map.get(year_int, "/")
-        archive_url = f"{self.base_url}{archive_path}"
-        
-        try:
-            r = requests.get(archive_url, headers=self.headers, timeout=10)
-            
-            # SMART ENCODING FALLBACK
-            try:
-                html_text = r.content.decode('utf-8')
-            except UnicodeDecodeError:
-                html_text = r.content.decode('windows-1250', errors='replace')
-                
-            if r.status_code != 200:
-                logging.error(f"Failed to load calendar for {year_full} (Status: {r.status_code})")
-                return []
-            
-            soup = BeautifulSoup(html_text, 'html.parser')
-            links = []
-            year_short_str = str(year_full)[-2:] 
-            
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                # Strictly extract the YY from the YYMMDDpes.htm filename
-                match = re.search(r'(\d{2})\d{4}pes\.html?', href)
-                if match:
-                    link_year = match.group(1)
-                    if link_year == year_short_str:
-                        links.append(href)
-            
-            clean_links = []
-            for link in set(links):
-                if link.startswith('/'):
-                    clean_links.append(link)
-                else:
-                    clean_links.append(f"/{link}")
-            
-            clean_links.sort()
-            return clean_links
-        except Exception as e:
-            logging.error(f"Error fetching calendar for {year_full}: {e}")
-            return []
+def parse_years(spec, available):
+    # Same formats as the GUI: 2025, 2010-2015 or ALL
+    spec = spec.strip().upper()
+    if spec == "ALL":
+        return sorted(available)
+    if "-" in spec:
+        start_y, _, end_y = spec.partition("-")
+        if start_y.isdigit() and end_y.isdigit():
+            y_min, y_max = sorted((int(start_y), int(end_y)))
+            return [y for y in range(y_min, y_max + 1) if y in available]
+        return []
+    if spec.isdigit() and int(spec) in available:
+        return [int(spec)]
+    return []
 
-    def scrape_day(self, relative_path, do_sanitize=True):
-        url = f"{self.base_url}{relative_path}"
-        try:
-            r = requests.get(url, headers=self.headers, timeout=10)
-            if r.status_code != 200:
-                return None
 
-            # SMART ENCODING FALLBACK
-            try:
-                html_text = r.content.decode('utf-8')
-            except UnicodeDecodeError:
-                html_text = r.content.decode('windows-1250', errors='replace')
+def refresh_indexes(args, year, data):
+    # Keeps the "on this day" files and the search index in step with every
+    # shard the batch writes
+    try:
+        update_indexes(year, data, args.publish_dir)
+    except Exception as e:
+        logging.error(f"Failed to update the published indexes for {year}: {e}")
 
-            soup = BeautifulSoup(html_text, 'html.parser')
-            bullets = []
-            
-            start_node = soup.find(
-                string=lambda t: isinstance(t, Comment) and 'odsud' in t.lower()
-            )
-            
-            if start_node:
-                curr = start_node.next_element
-                text_buffer = []
-                html_tag_bypass = "<" + "!--"
-                
-                # Helper function to compile buffered text into a bullet
-                def flush_buffer():
-                    if not text_buffer: return False
-                    
-                    bullet = " ".join(text_buffer).strip()
-                    if do_sanitize: 
-                        bullet = self.sanitize_text(bullet)
-                    
-                    text_buffer.clear()
-                    
-                    if len(bullet) > 5 and not bullet.startswith(html_tag_bypass):
-                        if "Pokud vám nějaká zpráva přijde debilní" in bullet:
-                            return True # Kill switch
-                            
-                        b_lower = bullet.lower()
-                        if "facebook.com" not in b_lower and "digineff.cz" not in b_lower:
-                            bullets.append(bullet)
-                            
-                            # WEATHER KILL-SWITCH
-                            weather_prefixes = [
-                                "počasí", "u nás", "mrazy", "slunečn", "zataženo", 
-                                "oblačno", "jasno", "dnes", "čeká se", "ráno lilo"
-                            ]
-                            if any(b_lower.startswith(w) for w in weather_prefixes) or \
-                               "počasí v praze" in b_lower or "počasí praha" in b_lower:
-                                return True # Stop parsing immediately
-                    return False
-
-                # Linear Token Stream Parser
-                while curr:
-                    curr_name = getattr(curr, 'name', '')
-                    
-                    # 1. STOP CONDITIONS (Legacy comments)
-                    if isinstance(curr, Comment):
-                        c_text = curr.lower()
-                        if 'konec' in c_text or ('xxxxxxxx' in c_text and 'odsud' not in c_text):
-                            flush_buffer()
-                            break
-                            
-                    # 2. STOP CONDITIONS (Major structural shifts)
-                    if curr_name in ['table', 'div']:
-                        flush_buffer()
-                        break
-                    if curr_name == 'font' and curr.get('color') == 'navy':
-                        flush_buffer()
-                        break
-
-                    # 3. BULLET SPLITTERS (Flush buffer on new lines)
-                    if curr_name in ['li', 'br', 'p', 'ul', 'ol', 'hr']:
-                        if flush_buffer():
-                            break
-
-                    # 4. COLLECT PURE TEXT (Ignores formatting tags like <b>)
-                    if type(curr).__name__ == 'NavigableString':
-                        t = str(curr).strip()
-                        if t:
-                            text_buffer.append(t)
-                            
-                    curr = curr.next_element
-                    
-                # Final flush for the last item
-                flush_buffer()
-                
-            return bullets
-        except Exception as e:
-            logging.error(f"Error scraping {url}: {e}")
-            return None
 
+def report_write(year, filename, days, diff):
+    # Prints what a shard write did. Returns True when the shard changed.
+    if diff is None:
+        events.emit("write", file=filename, status="unchanged", days=days)
+        print(f"[=] UNCHANGED: {filename} ({days} days), not rewritten")
+        return False
+    events.emit("write", file=filename, status="changed", days=days,
+                added=len(diff.added), changed=len(diff.changed), removed=len(diff.removed))
+    print(f"[+] SUCCESS: Saved {days} days to {filename}")
+    print(f"    {describe_diff(diff)}")
+    metrics.count("days_added", len(diff.added), year=year)
+    metrics.count("days_changed", len(diff.changed), year=year)
+    metrics.count("days_removed", len(diff.removed), year=year)
+    return True
 
-def main():
-    print("="*50)
-    print("HYLEE CLI BATCH SCRAPER v2.2 (SILENT MODE)")
-    print("="*50)
-    print("Notice: Linear Token Stream Engine Online.")
-    print("Daily progress spam is hidden. Only years and completions will print.")
-    print("Errors are being saved to 'hylee_errors.log'.\n")
-    
-    scraper = HyenaScraper()
-    years = sorted(list(scraper.archive_map.keys()))
+
+def run_batch(args, scraper, years, store):
+    incremental = args.incremental
+
+    if args.resume:
+        state = load_run_state()
+        if not state:
+            print("Nothing to resume: no interrupted run found.")
+            return
+        incremental = state["options"].get("incremental", False)
+        years = [y for y in state["years"] if y not in state["done"]]
+        print(f"Resuming interrupted run: {len(years)} year(s) left.\n")
+    else:
+        state = {"years": years, "done": [], "options": {"incremental": incremental}}
+        save_run_state(state)
     
     for year in years:
         print(f"--- STARTING YEAR: {year} ---")
@@ -211,40 +95,408 @@ def main():
         if not links:
             logging.error(f"No daily links found for {year}. Skipping.")
             continue
+
+        # Days already journaled by the interrupted run are not fetched again
+        journal = ShardJournal(year)
+        journal_days, processed = journal.replay() if args.resume else ({}, set())
+        links = [link for link in links if link_date(link) not in processed]
+            
+        existing = {}
+        if incremental:
+            existing = store.load_year(year)
+            links = pending_links(links, existing)
+            if not links and not journal_days:
+                print(f"[=] UP TO DATE: {len(existing)} days already in {store.describe(year)}\n")
+                journal.remove()
+                state["done"].append(year)
+                save_run_state(state)
+                continue
+            print(f"Incremental: {len(existing)} days on disk, fetching {len(links)} missing.")
+        if processed:
+            print(f"Resume: {len(processed)} days already journaled, fetching {len(links)} more.")
             
-        year_data = {}
+        year_data = dict(journal_days)
+        journal.open(resume=args.resume)
         
-        for link in links:
-            match = re.search(r'(\d{2})(\d{2})(\d{2})pes', link)
-            if match:
-                date_str = f"20{match.group(1)}-{match.group(2)}-{match.group(3)}"
-                
-                bullets = scraper.scrape_day(link)
-                
+        try:
+            for link, bullets in scraper.scrape_many(links, workers=args.workers, processes=args.processes):
+                date_str = link_date(link)
+                journal.append(date_str, bullets)
+                    
                 if bullets is None:
                     logging.error(f"Failed to fetch {date_str} (HTTP Error / Timeout)")
                 elif len(bullets) == 0:
                     logging.error(f"0 bullets extracted for {date_str}. Unusual HTML format.")
                 else:
                     year_data[date_str] = bullets
-                
-                # Polite scraping delay
-                time.sleep(0.2)
+        finally:
+            journal.close()
                 
         if year_data:
-            sorted_data = dict(sorted(year_data.items()))
-            filename = f"hyena_{year}.json"
+            sorted_data = merge_days(existing, year_data)
+            filename = store.describe(year)
             
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(sorted_data, f, ensure_ascii=False, indent=2)
-                print(f"[+] SUCCESS: Saved {len(sorted_data)} days to {filename}\n")
+                # Incremental runs only add days; a backend that can upsert writes just those
+                with metrics.stage("write", year):
+                    diff = store.save_year(year, sorted_data, changed=list(year_data) if incremental else None)
             except Exception as e:
                 logging.error(f"CRITICAL ERROR saving {filename}: {e}")
+                continue
+            if report_write(year, filename, len(sorted_data), diff):
+                refresh_indexes(args, year, sorted_data)
+            print()
+
+        # Compacted: the journal is no longer needed
+        journal.remove()
+        state["done"].append(year)
+        save_run_state(state)
+
+    clear_run_state()
+
+
+def run_snapshot(args, scraper, years):
+    # Every daily page of the selected years, packed into one corpus file
+    def _pages():
+        for year in years:
+            print(f"--- SNAPSHOT YEAR: {year} ---")
+            links = scraper.get_daily_links(year)
+            if not links:
+                logging.error(f"No daily links found for {year}. Skipping.")
+                continue
+            for link, content in scraper.fetch_many(links, workers=args.workers):
+                if content is None:
+                    logging.error(f"Failed to fetch {link_date(link)} (HTTP Error / Timeout)")
+                else:
+                    yield link, content
+
+    # Pages not fetched this run (other years, failed fetches) stay as they were
+    written, kept = write_corpus(args.corpus, _pages())
+    kept_note = f", kept {kept} pages from the previous corpus" if kept else ""
+    print(f"[+] SUCCESS: Packed {written} pages into {args.corpus}{kept_note}\n")
+
+
+def run_reextract(args, years, store):
+    # Regenerates the shards from the corpus alone: no network at all
+    if not os.path.exists(args.corpus):
+        print(f"No corpus at {args.corpus}. Run 'python hylee.py snapshot' first.")
+        return
+    shards, empty, failed = reextract(args.corpus, set(years), processes=args.processes or None,
+                                      engine=args.engine, windowed=not args.no_window)
+    for link, error in failed:
+        logging.error(f"Extraction failed for {link_date(link)}: {type(error).__name__}: {error}")
+    for link in empty:
+        logging.error(f"0 bullets extracted for {link_date(link)}. Unusual HTML format.")
+    for year, year_data in sorted(shards.items()):
+        filename = store.describe(year)
+        # Merged into the stored days, never replacing them: a day the corpus
+        # lacks or that now extracts empty keeps its bullets
+        year_data = merge_days(store.load_year(year), year_data)
+        try:
+            with metrics.stage("write", year):
+                diff = store.save_year(year, year_data)
+        except Exception as e:
+            logging.error(f"CRITICAL ERROR saving {filename}: {e}")
+            continue
+        if report_write(year, filename, len(year_data), diff):
+            refresh_indexes(args, year, year_data)
+    print()
+
+
+def run_watch(args, scraper, store):
+    # Long-running: keeps the live shard fresh, one conditional GET per poll
+    watcher = LiveWatcher(scraper, store, recheck=args.recheck, workers=args.workers)
+    if not watcher.years:
+        print("No year is served from the front page. Nothing to watch.")
+        return
+
+    def _interrupt(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    names = ", ".join(store.describe(y) for y in watcher.years)
+    print(f"Watching {scraper.base_url}/ for {names}, polling every {args.interval:g}s (Ctrl+C to stop).")
+    catch_up = True
+    try:
+        while True:
+            try:
+                changes, failed = watcher.poll(catch_up=catch_up)
+            except Exception as e:
+                logging.error(f"Watch poll failed: {e}")
+            else:
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+                if catch_up:
+                    print(f"[{stamp}] Catch-up done: {len(changes)} shard(s) updated.")
+                for year, data, diff in changes:
+                    print(f"[{stamp}] ", end="")
+                    report_write(year, store.describe(year), len(data), diff)
+                    refresh_indexes(args, year, data)
+                    if args.publish:
+                        run_publish(args, [year], store)
+                if failed:
+                    logging.error(f"Watch: {failed} day(s) could not be fetched, retrying on the next poll")
+                catch_up = False
+            if args.catch_up:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\nWatch stopped.")
+    print()
+
+
+def run_publish(args, years, store):
+    # Minified, precompressed copies of the shards for the userscript
+    manifest, written = publish(years, args.publish_dir, months=args.months, load_year=store.load_year)
+    total = sum(e["bytes"] for e in manifest["files"].values())
+    packed = sum(e["gz"] for e in manifest["files"].values())
+    print(f"[+] PUBLISHED: {written} file(s) updated in {args.publish_dir}/ "
+          f"({len(manifest['files'])} files, {total / 1024:.0f} KB, {packed / 1024:.0f} KB gzipped)")
+    if not any("br" in e for e in manifest["files"].values()):
+        print("Notice: 'brotli' is not installed, only .gz variants were written.")
+    print()
+
+
+def run_search(args, store):
+    index = SearchIndex(args.publish_dir, load_year=store.load_year)
+    if not index.available():
+        print(f"No search index in {args.publish_dir}/. Run 'python hylee.py publish' first.")
+        return
+    query = " ".join(args.query)
+    results = index.search(query, limit=args.limit)
+    for date_str, bullet in results:
+        print(f"{date_str}  {bullet}")
+    print(f"\n{len(results)} result(s) for '{query}'" + (" (limit reached)" if len(results) == args.limit else ""))
+
+
+def run_events(args):
+    # Answers questions from the event log without post-processing scripts:
+    #   python hylee.py events --status failed --years 2004
+    #   python hylee.py events --slowest 20
+    if not os.path.exists(args.events):
+        print(f"No event log at {args.events}. It is written by scrape, watch and the GUI.")
+        return
+    years = None if args.years.strip().upper() == "ALL" else parse_years(args.years, range(2000, 2100))
+    records = query(read_events(args.events), stage=args.stage, status=args.status, years=years, level=args.min_level)
+    if args.slowest:
+        results = slowest(records, args.slowest)
+    else:
+        results = list(deque(records, maxlen=args.limit)) # The most recent --limit matches
+    for record in results:
+        print(format_event(record))
+    print(f"\n{len(results)} event(s)" + (" (latest --limit shown)" if len(results) == args.limit and not args.slowest else ""))
+
+
+def run_export(args, store, years):
+    # Writes hyena_YYYY.json shards from the store in the exact published format
+    if store.name == "json":
+        print("The JSON store already is the shards. Use --store sqlite to export a database.")
+        return
+    for year, days in sorted(export_shards(store, years).items()):
+        print(f"[+] EXPORTED: {days} days to {shard_filename(year)}")
+    print()
+
+
+def run_import(args, store, years):
+    # Loads existing hyena_YYYY.json shards into the database
+    if store.name == "json":
+        print("Nothing to import into the JSON store. Use --store sqlite.")
+        return
+    for year, days in sorted(import_shards(store, years).items()):
+        print(f"[+] IMPORTED: {days} days from {shard_filename(year)}")
+    print()
+
+
+def profiled(func, path="hylee_profile.prof"):
+    # --profile: cProfile for where the time goes, tracemalloc for peak memory
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(func)
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics('lineno')[:10]
+        tracemalloc.stop()
+        profiler.dump_stats(path)
+        print(f"\nProfile saved to {path} (open with: python -m pstats {path})")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+        print(f"Memory: {current / 1048576:.1f} MB still allocated, {peak / 1048576:.1f} MB peak")
+        for stat in top:
+            print(f"  {stat}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hylee CLI batch scraper")
+    parser.add_argument("command", nargs="?", default="scrape", choices=("scrape", "snapshot", "reextract", "publish", "search", "export", "import", "watch", "events"),
+                        help="scrape (default): crawl and write shards; snapshot: pack raw pages into "
+                             "the corpus; reextract: rebuild shards from the corpus offline; "
+                             "publish: write compact shards for the userscript; "
+                             "search: look words up in the published search index; "
+                             "export/import: SQLite store to/from hyena_YYYY.json shards; "
+                             "watch: keep the live front-page shard fresh; "
+                             "events: query the structured event log")
+    parser.add_argument("query", nargs="*",
+                        help="Search terms (search only). Diacritics are optional; end a term with * for a prefix match")
+    parser.add_argument("--years", default="ALL",
+                        help="Years to process: 2025, 2010-2015 or ALL (default: ALL)")
+    parser.add_argument("--corpus", default=CORPUS_FILE,
+                        help=f"Packed raw-HTML corpus for snapshot/reextract (default: {CORPUS_FILE})")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent page fetches (default: 4)")
+    parser.add_argument("--base-url", default=None,
+                        help="Crawl another host instead of https://hyena.cz (e.g. bench/replay_server.py)")
+    parser.add_argument("--max-workers", type=int, default=16,
+                        help="Ceiling for adaptive concurrency: grows from --workers while the host stays fast (default: 16)")
+    parser.add_argument("--retries", type=int, default=3,
+                        help="Retries per page on timeouts, connection errors and 429/5xx, with jittered backoff (default: 3)")
+    parser.add_argument("--rps", type=float, default=5.0,
+                        help="Host-wide requests per second ceiling (default: 5)")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Parse on a pool of N processes fed by the fetch threads (default: 0, parse on the fetch threads)")
+    parser.add_argument("--cache-dir", default=".hylee_cache",
+                        help="Raw page cache directory (default: .hylee_cache)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always download pages, never read or write the cache")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="Revalidate frozen years with conditional GETs instead of trusting the cache")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch days missing from the existing hyena_YYYY.json shards and merge them in")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last interrupted batch run from its journals")
+    parser.add_argument("--engine", choices=ENGINES, default="soup",
+                        help="Extraction engine: soup (BeautifulSoup tree walk) or stream (tokenizer, faster)")
+    parser.add_argument("--no-window", action="store_true",
+                        help="Always parse the full page instead of the odsud anchor window")
+    parser.add_argument("--rules", default=None,
+                        help="Kill-switch/filter rule file (default: hylee_rules.json)")
+    parser.add_argument("--publish", action="store_true",
+                        help="After scrape/reextract, also publish the written years")
+    parser.add_argument("--publish-dir", default=PUBLISH_DIR,
+                        help=f"Output directory for publish (default: {PUBLISH_DIR})")
+    parser.add_argument("--months", action="store_true",
+                        help="Publish per-month sub-shards next to each year")
+    parser.add_argument("--store", choices=STORES, default="json",
+                        help="Where days are stored: json (hyena_YYYY.json shards, default) or sqlite")
+    parser.add_argument("--db", default=DB_FILE,
+                        help=f"SQLite database for --store sqlite (default: {DB_FILE})")
+    parser.add_argument("--report", default=None,
+                        help="Write per-stage timings, byte counts and rule hits to FILE (.prom: Prometheus textfile, otherwise JSON)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile and tracemalloc; saves hylee_profile.prof")
+    parser.add_argument("--interval", type=float, default=300,
+                        help="Watch: seconds between front page polls (default: 300)")
+    parser.add_argument("--recheck", type=int, default=2,
+                        help="Watch: newest days refetched whenever the front page changes, to pick up edits (default: 2)")
+    parser.add_argument("--catch-up", action="store_true",
+                        help=f"Watch: run one catch-up pass for the downtime since {WATCH_STATE_FILE} was written, then exit")
+    parser.add_argument("--events", default=EVENTS_FILE,
+                        help=f"Structured JSONL event log, one record per fetch/day/write (default: {EVENTS_FILE}; '' disables it)")
+    parser.add_argument("--log-level", choices=tuple(LEVELS), default="info",
+                        help="Lowest level written to the event log (default: info; warning keeps only problems)")
+    parser.add_argument("--log-max-mb", type=float, default=10,
+                        help="Rotate the event log at this size in MB (default: 10)")
+    parser.add_argument("--log-backups", type=int, default=3,
+                        help="Rotated event logs to keep (default: 3)")
+    parser.add_argument("--stage", choices=("fetch", "extract", "write", "run"), default=None,
+                        help="Events: only this stage")
+    parser.add_argument("--status", default=None,
+                        help="Events: only this status, e.g. failed, empty, ok, 404, error, changed")
+    parser.add_argument("--min-level", choices=tuple(LEVELS), default=None,
+                        help="Events: only records at this level or above")
+    parser.add_argument("--slowest", type=int, default=0,
+                        help="Events: the N fetches with the highest latency")
+    parser.add_argument("--limit", type=int, default=50,
+                        help="Maximum number of search results or events (default: 50)")
+    args = parser.parse_intermixed_args()
+
+    if args.profile:
+        profiled(lambda: run(args))
+    else:
+        run(args)
+
+
+def run(args):
+    if args.command == "events":
+        run_events(args)
+        return
+    store = open_store(args.store, args.db)
+    if args.command == "search":
+        run_search(args, store)
+        return
+    events.configure(path=args.events, level=args.log_level,
+                     max_bytes=int(args.log_max_mb * 1024 * 1024), backups=args.log_backups)
+
+    if args.rules:
+        os.environ["HYLEE_RULES"] = os.path.abspath(args.rules)
+        load_rulebook(args.rules)
+
+    print("="*50)
+    print("HYLEE CLI BATCH SCRAPER v2.2 (SILENT MODE)")
+    print("="*50)
+    print("Notice: Linear Token Stream Engine Online.")
+    if args.command in ("scrape", "snapshot", "watch"):
+        print(f"Concurrency: {args.workers} workers (adaptive up to {max(args.workers, args.max_workers)}), max {args.rps:g} requests/sec.")
+    print("Daily progress spam is hidden. Only years and completions will print.")
+    print("Errors are being saved to 'hylee_errors.log'.\n")
+    
+    scraper = HyenaScraper(user_agent="HyleeArchiver-CLI/2.2")
+    if args.base_url:
+        scraper.base_url = args.base_url.rstrip("/")
+    scraper.limiter = TokenBucket(rate=args.rps)
+    scraper.retry = RetryPolicy(retries=args.retries)
+    scraper.max_workers = args.max_workers
+    scraper.cache = None if args.no_cache else PageCache(args.cache_dir)
+    scraper.revalidate = args.revalidate
+    scraper.engine = args.engine
+    scraper.windowed = not args.no_window
+
+    years = parse_years(args.years, scraper.archive_map)
+    if not years:
+        print("Invalid --years. Use YYYY, YYYY-YYYY, or ALL.")
+        return
+
+    events.emit("run", command=args.command, status="start", years=args.years)
+    if args.command == "snapshot":
+        run_snapshot(args, scraper, years)
+    elif args.command == "reextract":
+        run_reextract(args, years, store)
+    elif args.command == "export":
+        run_export(args, store, years)
+    elif args.command == "import":
+        run_import(args, store, years)
+    elif args.command == "scrape":
+        run_batch(args, scraper, years, store)
+    elif args.command == "watch":
+        run_watch(args, scraper, store)
+
+    if args.command == "publish" or (args.publish and args.command in ("scrape", "reextract")):
+        run_publish(args, years, store)
+    store.close()
+
+    hits = load_rulebook().take_hits()
+    if hits:
+        print("Rule hits:")
+        for name, count in hits.most_common():
+            print(f"  {count:>6}  {name}")
+        print()
+
+    timings = metrics.summary()
+    if timings:
+        print("Stage timings:")
+        print(timings)
+        print()
+    if args.report:
+        metrics.write_report(args.report, hits)
+        print(f"Report written to {args.report}\n")
+    events.emit("run", command=args.command, status="done")
+    events.close()
 
     print("="*50)
     print("ALL YEARS PROCESSED.")
     print("="*50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
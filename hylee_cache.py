@@ -0,0 +1,95 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import namedtuple
+
+# Minimal stand-in for a requests.Response, so cached pages and live pages look
+# the same to get_daily_links / scrape_day.
+Page = namedtuple("Page", "status_code content")
+
+# The process umask, read once at import: os.umask can only be read by setting
+# it, and doing that per write would race with threads creating files
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def atomic_write(path, data):
+    # Write-to-temp-and-rename, so a crash never leaves a half-written file behind
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+    try:
+        # mkstemp creates 0600 files; give the result the usual umask-based mode
+        # so published files stay readable by a web server
+        os.chmod(tmp_path, 0o666 & ~UMASK)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class PageCache:
+    # Persistent raw page cache.
+    #   objects/ab/abcd....gz  -> gzip'd response bytes, named by their sha256
+    #   meta/<sha1(url)>.json  -> url, body hash, ETag, Last-Modified, fetch time
+    # Bodies are content-addressed, so identical pages are stored once. Each URL
+    # has its own small metadata file, which keeps concurrent workers from
+    # fighting over one shared index.
+    def __init__(self, root=".hylee_cache"):
+        self.root = root
+
+    def _meta_path(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "meta", key[:2], f"{key}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.gz")
+
+    def lookup(self, url):
+        try:
+            with open(self._meta_path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or not os.path.exists(self._object_path(entry["sha256"])):
+            return None
+        return entry
+
+    def read(self, entry):
+        with gzip.open(self._object_path(entry["sha256"]), "rb") as f:
+            return f.read()
+
+    def store(self, url, content, etag=None, last_modified=None):
+        digest = hashlib.sha256(content).hexdigest()
+        obj_path = self._object_path(digest)
+        if not os.path.exists(obj_path):
+            atomic_write(obj_path, gzip.compress(content, mtime=0))
+
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched": int(time.time()),
+        }
+        atomic_write(self._meta_path(url), json.dumps(entry).encode("utf-8"))
+        return entry
+
+    def touch(self, entry):
+        # Record a successful 304 revalidation
+        entry["fetched"] = int(time.time())
+        atomic_write(self._meta_path(entry["url"]), json.dumps(entry).encode("utf-8"))
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
@@ -0,0 +1,81 @@
+import json
+import re
+import threading
+import time
+
+from hylee_cache import atomic_write
+
+# One pass over the decoded archive page: every match is either a comment (which
+# we skip, just like BeautifulSoup would) or the href of an <a> tag.
+ANCHOR_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<a\b[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))',
+    re.IGNORECASE | re.DOTALL
+)
+DAY_RE = re.compile(r'(\d{2})\d{4}pes\.html?')
+
+
+def scan_archive(html_text):
+    # Sorts every YYMMDDpes link on an archive page into its year:
+    # {"2004": ["/040102pes.htm", ...], "2005": [...]}
+    by_year = {}
+    for m in ANCHOR_RE.finditer(html_text):
+        href = m.group(1) or m.group(2) or m.group(3)
+        if not href:
+            continue
+        day = DAY_RE.search(href)
+        if not day:
+            continue
+        link = href if href.startswith('/') else f"/{href}"
+        by_year.setdefault(f"20{day.group(1)}", set()).add(link)
+    return {year: sorted(links) for year, links in sorted(by_year.items())}
+
+
+class CalendarIndex:
+    # Persistent archive page URL -> year -> daily links map.
+    # Several years share one archive page (/archiv1.html holds 2003-2005), so
+    # each distinct page is fetched and scanned once and every year reads from
+    # the same entry. Frozen pages are reused across runs; live pages are
+    # rescanned once per run (see `fresh`).
+    def __init__(self, path="hylee_calendar.json"):
+        self.path = path
+        self.pages = {}
+        self.fresh = set()
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.pages = json.load(f)
+        except (OSError, ValueError):
+            self.pages = {}
+
+    def save(self):
+        data = json.dumps(self.pages, ensure_ascii=False, indent=1)
+        atomic_write(self.path, data.encode('utf-8'))
+
+    def lookup(self, archive_url, refresh=False, since=None):
+        # None when the page must be (re)scanned: unknown, live and not scanned
+        # this run, or scanned before `since` (a frozen page scanned while its
+        # years were still live)
+        with self.lock:
+            entry = self.pages.get(archive_url)
+            if entry is None or (refresh and archive_url not in self.fresh):
+                return None
+            if since is not None and entry.get("scanned", 0) < since and archive_url not in self.fresh:
+                return None
+            return entry["years"]
+
+    def year_links(self, year):
+        # Every scanned daily link of one year, without touching the network.
+        # [] when no page listing the year has been scanned yet.
+        with self.lock:
+            links = {link for entry in self.pages.values() for link in entry["years"].get(str(year), [])}
+        return sorted(links)
+
+    def store(self, archive_url, years):
+        with self.lock:
+            self.pages[archive_url] = {"scanned": int(time.time()), "years": years}
+            self.fresh.add(archive_url)
+            self.save()
@@ -0,0 +1,315 @@
+import datetime
+import logging
+import time
+from functools import partial
+
+from hylee_fetch import TokenBucket, RetryPolicy, CircuitBreaker, AdaptiveConcurrency, SingleFlight, fetch_ordered
+from hylee_cache import PageCache, Page
+from hylee_calendar import CalendarIndex, scan_archive
+from hylee_rules import load_rulebook
+from hylee_metrics import metrics
+from hylee_events import events
+from hylee_extract import decode_html, extract_page, extract_link_counted, sanitize_text
+from hylee_shards import link_year, link_date
+
+# Shared scraper core for the CLI (hylee.py) and the GUI (hylee_gui.py).
+# requests, BeautifulSoup and the process pool machinery are imported on first
+# use, so importing this module stays cheap and the Tk window paints at once.
+
+
+class HyenaScraper:
+    def __init__(self, log_callback=None, user_agent="HyleeArchiver/2.2"):
+        self.base_url = "https://hyena.cz"
+        self.headers = {'User-Agent': user_agent}
+        # Errors go to log_callback (the GUI console) or the logging module;
+        # progress notes only show up when a callback is attached
+        self.log = log_callback if log_callback else logging.error
+        self.info = log_callback if log_callback else (lambda msg: None)
+        
+        self.archive_map = {
+            2026: "/", 
+            2025: "/inc/archiv20.htm",
+            2024: "/inc/archiv19.htm",
+            2023: "/inc/archiv18.htm",
+            2022: "/inc/archiv17.htm",
+            2021: "/inc/archiv16.htm",
+            2020: "/inc/archiv15.htm",
+            2019: "/inc/archiv14.htm",
+            2018: "/inc/archiv13.htm",
+            2017: "/inc/archiv12.htm",
+            2016: "/archiv11.htm",
+            2015: "/archiv10.htm",
+            2014: "/archiv9.htm",
+            2013: "/archiv8.htm",
+            2012: "/archiv7.htm",
+            2011: "/archiv6.htm",
+            2010: "/archiv5.html",
+            2009: "/archiv4.html",
+            2008: "/archiv3.html",
+            2007: "/archiv2.html",
+            2006: "/archiv2.html",
+            2005: "/archiv1.html",
+            2004: "/archiv1.html",
+            2003: "/archiv1.html"
+        }
+
+        # One limiter for the whole host, shared by every fetch this scraper makes
+        self.limiter = TokenBucket(rate=5.0)
+        # Concurrent fetches of the same URL share one request
+        self.inflight = SingleFlight()
+
+        # Failed fetches are retried with jittered backoff; a failing host trips
+        # the breaker and pauses everyone; the AIMD limit moves the number of
+        # requests in flight between 1 and max_workers (None = the batch's workers)
+        self.retry = RetryPolicy()
+        self.breaker = CircuitBreaker()
+        self.concurrency = AdaptiveConcurrency()
+        self.max_workers = None
+        self.timeout = 10
+
+        # Raw page cache. Years before frozen_before never change, so their pages
+        # are served straight from disk unless revalidate is set, provided the
+        # copy was fetched after the year ended (see frozen_since).
+        self.cache = PageCache()
+        self.frozen_before = datetime.date.today().year
+        self.revalidate = False
+
+        # Archive page -> year -> daily links, shared by every year on the same page
+        self.calendar = CalendarIndex()
+
+        # Extraction engine: "soup" (BeautifulSoup tree walk) or "stream" (tokenizer)
+        self.engine = "soup"
+        # Parse only the odsud-to-stop slice of each page when it can be cut safely
+        self.windowed = True
+
+    def sanitize_text(self, text):
+        return sanitize_text(text)
+
+    def is_frozen(self, year):
+        return int(year) < self.frozen_before and not self.revalidate
+
+    def frozen_since(self, year):
+        # None while `year` may still change, else the moment it ended. Only a
+        # copy fetched after that is final: late-December days were still being
+        # edited (and re-checked by the watcher) while the year was live, so an
+        # older copy is revalidated once before it is trusted.
+        if not self.is_frozen(year):
+            return None
+        return time.mktime(datetime.date(int(year) + 1, 1, 1).timetuple())
+
+    def _get(self, url, frozen_since=None, year=None, urgent=False, should_stop=None):
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and frozen_since is not None and entry.get("fetched", 0) >= frozen_since:
+            metrics.count("cache_hits", year=year)
+            return Page(200, self.cache.read(entry))
+
+        # CONDITIONAL GET: let the server answer 304 instead of resending the page
+        headers = dict(self.headers)
+        if entry:
+            headers.update(self.cache.conditional_headers(entry))
+
+        r = self._request(url, headers, year, urgent, should_stop)
+
+        if self.cache:
+            if r.status_code == 304 and entry:
+                metrics.count("not_modified", year=year)
+                self.cache.touch(entry)
+                return Page(200, self.cache.read(entry))
+            if r.status_code == 200:
+                self.cache.store(url, r.content, r.headers.get('ETag'), r.headers.get('Last-Modified'))
+        return Page(r.status_code, r.content)
+
+    def _request(self, url, headers, year=None, urgent=False, should_stop=None):
+        # One logical GET. Timeouts, connection errors and 429/5xx answers are
+        # retried; anything else (200, 304, 404) is final. Returns the last
+        # response or raises the last network error. Urgent (interactive)
+        # requests skip the AIMD slot and jump the limiter queue. should_stop is
+        # the caller's own cancel flag, checked while the breaker is open.
+        import requests # Deferred: only the first real fetch pays for it
+
+        for attempt in range(self.retry.retries + 1):
+            if not self.breaker.wait(should_stop):
+                raise RuntimeError("stopped while the host was failing")
+            if not urgent:
+                self.concurrency.acquire()
+            r = error = None
+            latency = 0.0
+            try:
+                self.limiter.acquire(urgent)
+                start = time.monotonic()
+                with metrics.stage("fetch", year):
+                    r = requests.get(url, headers=headers, timeout=self.timeout)
+                latency = time.monotonic() - start
+            except requests.RequestException as e:
+                error = e
+            failed = error is not None or self.retry.retryable(r.status_code)
+            if not urgent:
+                self.concurrency.release(not failed, latency)
+
+            metrics.count("requests", year=year)
+            if r is not None:
+                metrics.count("bytes", len(r.content), year=year)
+            if not failed:
+                self.breaker.success()
+                return r
+
+            if self.breaker.failure():
+                metrics.count("breaker_open")
+                self.log(f"Host is failing, pausing all requests for {self.breaker.cooldown:.0f}s")
+            if attempt == self.retry.retries:
+                break
+            metrics.count("retries", year=year)
+            retry_after = r.headers.get('Retry-After') if r is not None else None
+            if not self.retry.sleep(self.retry.delay(attempt, retry_after), should_stop):
+                break
+
+        if error is not None:
+            raise error
+        return r
+
+    def get_daily_links(self, year_full, urgent=False):
+        year_int = int(year_full)
+        archive_path = self.archive_map.get(year_int, "/")
+
+        # An archive page is frozen once the newest year it holds is frozen
+        since = None
+        if archive_path != "/":
+            since = self.frozen_since(max(y for y, p in self.archive_map.items() if p == archive_path))
+
+        archive_url = f"{self.base_url}{archive_path}"
+        years = self.calendar.lookup(archive_url, refresh=since is None, since=since)
+        if years is None:
+            years = self._index_archive(year_full, archive_url, since, urgent)
+            if years is None:
+                return []
+        return list(years.get(str(year_int), []))
+
+    def _index_archive(self, year_full, archive_url, frozen_since=None, urgent=False):
+        self.info(f"Fetching calendar for {year_full}: {archive_url}")
+        
+        try:
+            r = self._get(archive_url, frozen_since=frozen_since, urgent=urgent)
+            
+            html_text = decode_html(r.content)
+                
+            if r.status_code != 200:
+                self.log(f"Failed to load calendar for {year_full} (Status: {r.status_code})")
+                return None
+            
+            years = scan_archive(html_text)
+            self.calendar.store(archive_url, years)
+            return years
+        except Exception as e:
+            self.log(f"Error fetching calendar for {year_full}: {e}")
+            return None
+
+    def fetch_day(self, relative_path, urgent=False, should_stop=None):
+        # Raw bytes of a daily page, or None on an HTTP error / timeout
+        url = f"{self.base_url}{relative_path}"
+        year = link_year(relative_path)
+        since = self.frozen_since(year) if year is not None else None
+        start = time.monotonic()
+        try:
+            r, merged = self.inflight.do(url, partial(self._get, url, frozen_since=since, year=year, urgent=urgent,
+                                                      should_stop=should_stop))
+            if merged:
+                metrics.count("merged_fetches", year=year)
+        except Exception as e:
+            events.emit("fetch", "error", date=link_date(relative_path), url=url, status="error",
+                        latency_ms=round((time.monotonic() - start) * 1000, 1), message=str(e))
+            self.log(f"Error scraping {url}: {e}")
+            return None
+        events.emit("fetch", "info" if r.status_code == 200 else "warning", date=link_date(relative_path), url=url,
+                    status=r.status_code, latency_ms=round((time.monotonic() - start) * 1000, 1), bytes=len(r.content))
+        if r.status_code != 200:
+            return None
+        return r.content
+
+    def fetch_conditional(self, relative_path, etag=None, last_modified=None):
+        # One conditional GET past the page cache, for a page that is polled on a
+        # schedule (watch mode's front page). A 304 means nothing changed since
+        # the given validators.
+        headers = dict(self.headers)
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return self._request(f"{self.base_url}{relative_path}", headers)
+
+    def scrape_day(self, relative_path, do_sanitize=True, urgent=False, should_stop=None, engine=None):
+        content = self.fetch_day(relative_path, urgent, should_stop)
+        if content is None:
+            return None
+        return self.extract_day(relative_path, content, do_sanitize, engine)
+
+    def extract_day(self, relative_path, content, do_sanitize=True, engine=None):
+        # Bullets of already fetched page bytes, or None when extraction fails.
+        # engine overrides self.engine for this page only.
+        try:
+            return extract_page(content, do_sanitize, engine or self.engine, self.windowed, link_year(relative_path))
+        except Exception as e:
+            url = f"{self.base_url}{relative_path}"
+            self.log(f"Error scraping {url}: {e}")
+            return None
+
+    def _start_batch(self, workers):
+        # AIMD starts at `workers` and may grow to max_workers; the pool is sized
+        # for the ceiling and the limit decides how many threads actually fetch
+        workers = max(1, int(workers))
+        ceiling = max(workers, self.max_workers or workers)
+        self.concurrency.reset(workers, ceiling)
+        return ceiling
+
+    def fetch_many(self, links, workers=4, should_stop=None):
+        # Raw bytes of many daily pages, (link, bytes or None) in input order
+        pool_size = self._start_batch(workers)
+        fetch = partial(self.fetch_day, should_stop=should_stop)
+        return fetch_ordered(fetch, links, workers=pool_size, should_stop=should_stop)
+
+    def scrape_many(self, links, do_sanitize=True, workers=4, should_stop=None, processes=0):
+        # Concurrent batch mode: round-trips overlap on a bounded thread pool while
+        # self.limiter keeps the host-wide request rate polite. Yields
+        # (link, bullets) in the same order as `links`.
+        pool_size = self._start_batch(workers)
+        if processes:
+            results = self._scrape_pipeline(links, do_sanitize, pool_size, should_stop, processes)
+        else:
+            def _scrape(link):
+                return self.scrape_day(link, do_sanitize, should_stop=should_stop)
+            results = fetch_ordered(_scrape, links, workers=pool_size, should_stop=should_stop)
+        for link, bullets in results:
+            self.log_day(link, bullets)
+            yield link, bullets
+
+    def log_day(self, link, bullets):
+        # One "extract" event per day: ok, empty (0 bullets) or failed (None)
+        if bullets is None:
+            level, status = "error", "failed"
+        elif not bullets:
+            level, status = "warning", "empty"
+        else:
+            level, status = "info", "ok"
+        fields = {} if bullets is None else {"bullets": len(bullets)}
+        events.emit("extract", level, date=link_date(link), url=f"{self.base_url}{link}", status=status, **fields)
+
+    def _scrape_pipeline(self, links, do_sanitize, workers, should_stop, processes):
+        # Parsing moves to a process pool; the fetch threads only move bytes
+        from hylee_pipeline import run_pipeline
+
+        extract = partial(extract_link_counted, do_sanitize=do_sanitize, engine=self.engine, windowed=self.windowed)
+        fetch = partial(self.fetch_day, should_stop=should_stop)
+        stages = run_pipeline(fetch, extract, links, io_workers=workers,
+                              cpu_workers=processes, should_stop=should_stop)
+        rulebook = load_rulebook()
+        for link, result in stages:
+            if isinstance(result, Exception):
+                self.log(f"Error scraping {self.base_url}{link}: {result}")
+                yield link, None
+                continue
+            if result is None: # Failed fetch: 404, timeout, ...
+                yield link, None
+                continue
+            bullets, hits, timings = result
+            rulebook.add_hits(hits)
+            metrics.merge(timings)
+            yield link, bullets
@@ -0,0 +1,136 @@
+import mmap
+import os
+import struct
+import tempfile
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from hylee_extract import extract_link_counted
+from hylee_metrics import metrics
+from hylee_rules import load_rulebook
+from hylee_shards import link_date
+
+CORPUS_FILE = "hylee_corpus.zip"
+
+
+def member_name(link):
+    # "/040102pes.htm" -> "2004/040102pes.htm"
+    name = link.lstrip('/')
+    return f"20{name[:2]}/{name}"
+
+
+def write_corpus(path, pages):
+    # Packs (link, raw bytes) pairs into one deflated zip. The zip central
+    # directory is the offset index, so any single page can be read without
+    # touching the rest. Written to a temp file and renamed into place.
+    # Every member of an existing corpus that `pages` did not replace is carried
+    # over: other years, and pages whose fetch failed this time (a 404 or a
+    # timeout must not drop a day from the corpus). Returns (written, kept).
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=".zip")
+    os.close(fd)
+    written = kept = 0
+    fresh = set()
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+            for link, content in pages:
+                name = member_name(link)
+                zf.writestr(name, content)
+                fresh.add(name)
+                written += 1
+            if os.path.exists(path):
+                with zipfile.ZipFile(path) as old:
+                    for info in old.infolist():
+                        if info.filename not in fresh:
+                            zf.writestr(info.filename, old.read(info))
+                            kept += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written, kept
+
+
+class Corpus:
+    # Read-only view of a packed corpus. The central directory is read once as
+    # the offset index; page bytes are then sliced straight out of an mmap.
+    def __init__(self, path=CORPUS_FILE):
+        with zipfile.ZipFile(path) as zf:
+            self.index = {info.filename: info for info in zf.infolist()}
+        self.f = open(path, 'rb')
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ) if self.index else b""
+
+    def links(self, years=None):
+        links = []
+        for name in self.index:
+            year, _, filename = name.partition('/')
+            if years is None or int(year) in years:
+                links.append(f"/{filename}")
+        return sorted(links)
+
+    def read(self, link):
+        info = self.index[member_name(link)]
+        # Local file header: 30 fixed bytes, then the name and extra fields
+        name_len, extra_len = struct.unpack_from('<HH', self.mm, info.header_offset + 26)
+        start = info.header_offset + 30 + name_len + extra_len
+        data = self.mm[start:start + info.compress_size]
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            return zlib.decompress(data, -15)
+        return data
+
+    def close(self):
+        if self.index:
+            self.mm.close()
+        self.f.close()
+
+
+# Each worker process opens the corpus once and keeps its own mmap
+_worker_corpus = None
+
+
+def _open_worker_corpus(path):
+    global _worker_corpus
+    _worker_corpus = Corpus(path)
+
+
+def _extract_member(job):
+    # A failed extraction comes back as its exception (like run_pipeline), so it
+    # is not mistaken for an empty page
+    link, do_sanitize, engine, windowed = job
+    try:
+        return link, extract_link_counted(link, _worker_corpus.read(link), do_sanitize, engine, windowed)
+    except Exception as e:
+        return link, e
+
+
+def reextract(path, years=None, processes=None, do_sanitize=True, engine="soup", windowed=True):
+    # Offline re-extraction: runs the current extraction rules over every page
+    # in the corpus on all cores. Returns {year: {date: bullets}}, the links that
+    # produced no bullets and (link, exception) for every page that failed.
+    corpus = Corpus(path)
+    try:
+        links = corpus.links(years)
+    finally:
+        corpus.close()
+
+    shards = {}
+    empty = []
+    failed = []
+    rulebook = load_rulebook()
+    jobs = [(link, do_sanitize, engine, windowed) for link in links]
+    with ProcessPoolExecutor(max_workers=processes or None, initializer=_open_worker_corpus, initargs=(path,)) as pool:
+        for link, result in pool.map(_extract_member, jobs, chunksize=32):
+            if isinstance(result, Exception):
+                failed.append((link, result))
+                continue
+            bullets, hits, timings = result
+            rulebook.add_hits(hits)
+            metrics.merge(timings)
+            date_str = link_date(link)
+            if bullets:
+                shards.setdefault(int(date_str[:4]), {})[date_str] = bullets
+            else:
+                empty.append(link)
+    return shards, empty, failed
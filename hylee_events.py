@@ -0,0 +1,147 @@
+import datetime
+import heapq
+import json
+import os
+import threading
+
+# STRUCTURED EVENT LOG: one JSON object per line instead of free-text console
+# spam, e.g.
+#   {"ts": "2026-10-18T10:34:30.512", "level": "info", "stage": "fetch", "date": "2004-01-02",
+#    "url": "https://hyena.cz/040102pes.htm", "status": 200, "latency_ms": 84.1, "bytes": 30211}
+# Stages: fetch (one per daily page: HTTP status or "error", latency, bytes),
+# extract (one per day: "ok", "empty" or "failed" and the bullet count), write
+# (one per shard: "changed" or "unchanged") and run (start / done).
+# Records below the configured level are dropped before they are serialized.
+# The file rotates by size: hylee_events.jsonl -> .1 -> .2 ... up to `backups`.
+# query() and slowest() answer "which dates failed in 2004" or "slowest 20
+# pages" straight from the files (python hylee.py events ...).
+EVENTS_FILE = "hylee_events.jsonl"
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+
+class EventLog:
+    def __init__(self, path=EVENTS_FILE, level="info", max_bytes=10 * 1024 * 1024, backups=3):
+        self.lock = threading.Lock()
+        self.file = None
+        self.size = 0
+        self.path = path
+        self.level = level
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def configure(self, path=None, level=None, max_bytes=None, backups=None):
+        with self.lock:
+            self._close()
+            if path is not None:
+                self.path = path
+            if level is not None:
+                self.level = level
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if backups is not None:
+                self.backups = max(0, backups)
+
+    def enabled(self, level):
+        return bool(self.path) and LEVELS[level] >= LEVELS[self.level]
+
+    def emit(self, stage, level="info", **fields):
+        if not self.enabled(level):
+            return
+        record = {"ts": datetime.datetime.now().isoformat(timespec="milliseconds"), "level": level, "stage": stage}
+        record.update(fields)
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self.lock:
+            try:
+                if self.file is None:
+                    self.file = open(self.path, "ab")
+                    self.size = self.file.tell()
+                if self.size and self.size + len(line) > self.max_bytes:
+                    self._rotate()
+                self.file.write(line)
+                self.file.flush()
+                self.size += len(line)
+            except OSError:
+                pass # The event log must never break a run
+
+    def _rotate(self):
+        # Called with self.lock held
+        self._close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "ab")
+        self.size = 0
+
+    def _close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+
+def log_files(path=EVENTS_FILE):
+    # Oldest rotated file first, the live file last
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        rotated.append(f"{path}.{i}")
+        i += 1
+    return rotated[::-1] + ([path] if os.path.exists(path) else [])
+
+
+def read_events(path=EVENTS_FILE):
+    for filename in log_files(path):
+        with open(filename, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue # A line cut short by a crash
+                if isinstance(record, dict):
+                    yield record
+
+
+def query(records, stage=None, status=None, years=None, level=None):
+    # Filters on exact stage and status; years applies to records with a date
+    years = {str(y) for y in years} if years else None
+    floor = LEVELS[level] if level else 0
+    for record in records:
+        if stage and record.get("stage") != stage:
+            continue
+        if status and str(record.get("status")) != status:
+            continue
+        if years and str(record.get("date", ""))[:4] not in years:
+            continue
+        if floor and LEVELS.get(record.get("level"), 0) < floor:
+            continue
+        yield record
+
+
+def slowest(records, n=20):
+    # The n fetch records with the highest latency
+    fetches = (r for r in records if r.get("stage") == "fetch" and isinstance(r.get("latency_ms"), (int, float)))
+    return heapq.nlargest(n, fetches, key=lambda r: r["latency_ms"])
+
+
+def format_event(record):
+    parts = [record.get("ts", "")[:19], f"{record.get('level', ''):<7}", f"{record.get('stage', ''):<7}"]
+    for key in ("date", "status", "bullets", "latency_ms", "url", "file", "message"):
+        if key in record:
+            value = record[key]
+            if key == "latency_ms":
+                value = f"{value:.0f} ms"
+            elif key == "bullets":
+                value = f"{value} bullets"
+            parts.append(str(value))
+    return "  ".join(parts)
+
+
+# One per process
+events = EventLog()
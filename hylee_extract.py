@@ -0,0 +1,344 @@
+import html
+import re
+from html.entities import html5 as HTML5_ENTITIES
+from html.parser import HTMLParser
+
+from hylee_metrics import metrics
+from hylee_rules import load_rulebook
+from hylee_shards import link_year
+
+ENGINES = ("soup", "stream")
+
+# Tags that end the news section outright, and tags that start a new bullet
+STOP_TAGS = ('table', 'div')
+SPLIT_TAGS = ('li', 'br', 'p', 'ul', 'ol', 'hr')
+
+# BeautifulSoup files text inside these tags under its own string classes
+# (Script, Stylesheet, ...), so the Linear Token Stream never collects it
+STRING_CONTAINERS = ('script', 'style', 'template', 'rt', 'rp')
+
+
+def sanitize_text(text):
+    text = re.sub(r'<[^>]*>', '', text)
+    text = text.replace('&nbsp;', ' ')
+    text = text.replace('&amp;', '&')
+    text = text.replace('&quot;', '"')
+    return " ".join(text.split())
+
+
+def decode_html(content):
+    # SMART ENCODING FALLBACK
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('windows-1250', errors='replace')
+
+
+# ANCHOR WINDOW: the news sits between the odsud comment and the first hard stop,
+# so only that slice of the raw bytes needs decoding and parsing. The markers are
+# matched on ASCII-lowercased bytes, which is safe for both utf-8 and windows-1250.
+# The window also picks its own encoding (decode_html on the slice), so the rest
+# of the page is never decoded. It starts at '<!--' and ends on '>' or '-->', so
+# no utf-8 sequence is cut. A pure-ASCII window decodes the same either way, and
+# windows-1250 Czech text is practically never valid utf-8, so the slice decides
+# as the whole page would.
+HARD_STOP_RE = re.compile(
+    rb'<(?:table|div)\b'
+    rb'|<font\b[^>]*navy'
+    rb'|<!--(?:(?!-->).){0,200}?(?:konec|xxxxxxxx)',
+    re.DOTALL
+)
+
+
+def inside_markup(lower, lo, hi):
+    # Conservative check that `hi` is a token boundary, given that `lo` is one:
+    # not inside an open comment, script/style block or tag. False positives
+    # only cost a fallback to the full page.
+    comment_open = lower.rfind(b'<!--', lo, hi)
+    if comment_open != -1 and lower.rfind(b'-->', comment_open + 4, hi) == -1:
+        return True
+    for tag in (b'script', b'style'):
+        if lower.rfind(b'<' + tag, lo, hi) > lower.rfind(b'</' + tag, lo, hi):
+            return True
+    return lower.rfind(b'<', lo, hi) > lower.rfind(b'>', lo, hi)
+
+
+def anchor_window(content):
+    # Returns the bytes from the odsud comment up to and including the first hard
+    # stop marker, or None when no safe window can be cut.
+    lower = content.lower()
+    pos = lower.find(b'odsud')
+    while pos != -1:
+        open_at = lower.rfind(b'<!--', 0, pos)
+        if open_at != -1 and lower.find(b'-->', open_at + 4, pos) == -1:
+            break
+        pos = lower.find(b'odsud', pos + 5)
+    else:
+        return None
+
+    anchor_end = lower.find(b'-->', pos)
+    if anchor_end == -1 or inside_markup(lower, 0, open_at):
+        return None
+    anchor_end += 3
+
+    # Markers that sit inside a comment, script or tag do not stop the walk
+    stop = HARD_STOP_RE.search(lower, anchor_end)
+    while stop and inside_markup(lower, anchor_end, stop.start()):
+        stop = HARD_STOP_RE.search(lower, stop.start() + 1)
+    if not stop:
+        return content[open_at:]
+    closer = b'-->' if stop.group().startswith(b'<!--') else b'>'
+    end = lower.find(closer, stop.end())
+    if end == -1:
+        return None
+    return content[open_at:end + len(closer)]
+
+
+def is_stop_comment(text):
+    c_text = text.lower()
+    return 'konec' in c_text or ('xxxxxxxx' in c_text and 'odsud' not in c_text)
+
+
+class BulletBuffer:
+    # Text collected since the last splitter, and the bullets flushed so far.
+    # Shared by both engines so they apply exactly the same rules.
+    def __init__(self, do_sanitize=True, rules=None):
+        self.do_sanitize = do_sanitize
+        self.rules = rules or load_rulebook().for_year()
+        self.text_buffer = []
+        self.bullets = []
+
+    def flush(self):
+        # Compiles buffered text into a bullet. Returns True when a kill-switch fired.
+        if not self.text_buffer: return False
+
+        bullet = " ".join(self.text_buffer).strip()
+        if self.do_sanitize:
+            bullet = sanitize_text(bullet)
+
+        self.text_buffer.clear()
+
+        if len(bullet) > 5 and not bullet.startswith("<" + "!--"):
+            # KILL-SWITCHES & FILTERS (see hylee_rules.json)
+            action = self.rules.classify(bullet)
+            if action == "kill":
+                return True
+            if action != "drop":
+                self.bullets.append(bullet)
+                if action == "stop":
+                    return True # Weather line: stop parsing immediately
+        return False
+
+
+def extract_soup(html_text, do_sanitize=True, rules=None):
+    return walk_soup(html_text, do_sanitize, rules)[0]
+
+
+def walk_soup(html_text, do_sanitize=True, rules=None, year=None):
+    # Linear Token Stream Engine over a full BeautifulSoup tree.
+    # Returns (bullets, stopped); stopped is False when the walk ran off the end.
+    from bs4 import BeautifulSoup # Deferred: the stream engine never needs it
+
+    with metrics.stage("parse", year):
+        soup = BeautifulSoup(html_text, 'html.parser')
+    with metrics.stage("extract", year):
+        return _walk_tree(soup, do_sanitize, rules)
+
+
+def _walk_tree(soup, do_sanitize, rules):
+    from bs4 import Comment
+
+    out = BulletBuffer(do_sanitize, rules)
+    stopped = False
+
+    start_node = soup.find(
+        string=lambda t: isinstance(t, Comment) and 'odsud' in t.lower()
+    )
+
+    if start_node:
+        curr = start_node.next_element
+
+        while curr:
+            curr_name = getattr(curr, 'name', '')
+
+            # 1. STOP CONDITIONS (Legacy comments)
+            if isinstance(curr, Comment):
+                if is_stop_comment(curr):
+                    out.flush()
+                    stopped = True
+                    break
+
+            # 2. STOP CONDITIONS (Major structural shifts)
+            if curr_name in STOP_TAGS:
+                out.flush()
+                stopped = True
+                break
+            if curr_name == 'font' and curr.get('color') == 'navy':
+                out.flush()
+                stopped = True
+                break
+
+            # 3. BULLET SPLITTERS (Flush buffer on new lines)
+            if curr_name in SPLIT_TAGS:
+                if out.flush():
+                    stopped = True
+                    break
+
+            # 4. COLLECT PURE TEXT (Ignores formatting tags like <b>)
+            if type(curr).__name__ == 'NavigableString':
+                t = str(curr).strip()
+                if t:
+                    out.text_buffer.append(t)
+
+            curr = curr.next_element
+
+        # Final flush for the last item
+        out.flush()
+
+    return out.bullets, stopped
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class StreamExtractor(HTMLParser):
+    # Event-driven twin of extract_soup. The tokenizer's events arrive in the
+    # same order as BeautifulSoup's next_element chain, so the rules are applied
+    # straight to the token stream without building a tree, and parsing ends at
+    # the first stop condition instead of running to the end of the page.
+    def __init__(self, do_sanitize=True, rules=None):
+        super().__init__(convert_charrefs=False)
+        self.out = BulletBuffer(do_sanitize, rules)
+        self.started = False
+        self.pending = []
+        self.containers = []
+        self.stopped = False
+
+    def end_data(self):
+        # Adjacent data events form one text node, like BeautifulSoup's endData()
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.pending = []
+        if self.started and not self.containers:
+            t = text.strip()
+            if t:
+                self.out.text_buffer.append(t)
+
+    def stop(self):
+        self.out.flush()
+        raise _StopParsing()
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    # Entities are resolved the way BeautifulSoup does it: unknown names stay
+    # literal ("&foo;" -> "&foo"), numeric references go through html.unescape.
+    def handle_entityref(self, name):
+        self.pending.append(HTML5_ENTITIES.get(name + ";", "&" + name))
+
+    def handle_charref(self, name):
+        self.pending.append(html.unescape(f"&#{name};"))
+
+    def handle_comment(self, data):
+        self.end_data()
+        if not self.started:
+            self.started = 'odsud' in data.lower()
+        elif is_stop_comment(data):
+            self.stop()
+
+    def handle_starttag(self, tag, attrs):
+        self.end_data()
+        if tag in STRING_CONTAINERS:
+            self.containers.append(tag)
+        if not self.started:
+            return
+        if tag in STOP_TAGS:
+            self.stop()
+        if tag == 'font' and dict(attrs).get('color') == 'navy':
+            self.stop()
+        if tag in SPLIT_TAGS:
+            if self.out.flush():
+                raise _StopParsing()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self.end_data()
+        if tag in self.containers:
+            while self.containers.pop() != tag:
+                pass
+
+    def handle_decl(self, decl):
+        self.end_data()
+
+    def handle_pi(self, data):
+        self.end_data()
+
+    def unknown_decl(self, data):
+        self.end_data()
+
+    def run(self, html_text):
+        try:
+            self.feed(html_text)
+            self.close()
+            self.end_data()
+        except _StopParsing:
+            self.stopped = True
+            return self.out.bullets
+        # Final flush for the last item
+        self.out.flush()
+        return self.out.bullets
+
+
+def extract_stream(html_text, do_sanitize=True, rules=None):
+    return StreamExtractor(do_sanitize, rules).run(html_text)
+
+
+def run_engine(html_text, do_sanitize=True, engine="soup", rules=None, year=None):
+    # Returns (bullets, stopped); year only labels the stage timings
+    if engine == "stream":
+        parser = StreamExtractor(do_sanitize, rules)
+        with metrics.stage("extract", year):
+            bullets = parser.run(html_text)
+        return bullets, parser.stopped
+    return walk_soup(html_text, do_sanitize, rules, year)
+
+
+def extract_bullets(html_text, do_sanitize=True, engine="soup", rules=None):
+    return run_engine(html_text, do_sanitize, engine, rules)[0]
+
+
+def extract_page(content, do_sanitize=True, engine="soup", windowed=True, year=None):
+    # Raw page bytes -> bullets. The fast path parses only the anchor window and
+    # is trusted only if the engine actually hit a stop inside it; anything else
+    # (no anchor, a marker that turned out not to stop the walk) falls back to
+    # the full page. `year` selects the era's rule set.
+    rules = load_rulebook().for_year(year)
+    metrics.count("pages", year=year)
+    if windowed:
+        window = anchor_window(content)
+        if window is not None:
+            with metrics.stage("decode", year):
+                html_text = decode_html(window)
+            bullets, stopped = run_engine(html_text, do_sanitize, engine, rules, year)
+            if stopped:
+                return bullets
+            metrics.count("window_fallbacks", year=year)
+    with metrics.stage("decode", year):
+        html_text = decode_html(content)
+    return run_engine(html_text, do_sanitize, engine, rules, year)[0]
+
+
+def extract_link_counted(link, content, do_sanitize=True, engine="soup", windowed=True):
+    # Process-pool variant: picks the era from the link and also hands back this
+    # process's rule hit counters and stage timings so the parent can add them
+    # to its own. Returns (bullets, hits, timings).
+    rulebook = load_rulebook()
+    rulebook.take_hits() # Drop anything inherited from a forked parent
+    metrics.reset()
+    bullets = extract_page(content, do_sanitize, engine, windowed, link_year(link))
+    return bullets, rulebook.take_hits(), metrics.take()
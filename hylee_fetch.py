@@ -0,0 +1,238 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    # Host-wide politeness ceiling. Every worker thread takes a token before it
+    # touches the network, so the site sees at most `rate` requests per second
+    # no matter how many round-trips are in flight. Urgent callers (interactive
+    # GUI work) get the next token ahead of any waiting batch worker.
+    def __init__(self, rate=5.0, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.urgent = 0
+        self.lock = threading.Lock()
+
+    def acquire(self, urgent=False):
+        if self.rate <= 0:
+            return
+        if urgent:
+            with self.lock:
+                self.urgent += 1
+        try:
+            while True:
+                with self.lock:
+                    now = time.monotonic()
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1 and (urgent or not self.urgent):
+                        self.tokens -= 1
+                        return
+                    wait = max(0.01, (1 - self.tokens) / self.rate)
+                time.sleep(wait)
+        finally:
+            if urgent:
+                with self.lock:
+                    self.urgent -= 1
+
+
+class SingleFlight:
+    # Merges concurrent calls for the same key: the first caller runs func, the
+    # others wait for its result. A day the batch is fetching and a parse of the
+    # same day in the explorer cost one request.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, func):
+        # Returns (result, merged)
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {"done": threading.Event(), "result": None, "error": None}
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+        try:
+            call["result"] = func()
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["done"].set()
+        return call["result"], False
+
+
+class RetryPolicy:
+    # Exponential backoff with full jitter: attempt n waits a random time in
+    # [0, min(cap, base * 2^n)], so workers that failed together do not retry
+    # together. A numeric Retry-After from the server wins (up to `cap`).
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, retries=3, base=0.5, cap=30.0):
+        self.retries = max(0, int(retries))
+        self.base = base
+        self.cap = cap
+
+    def retryable(self, status_code):
+        return status_code in self.RETRY_STATUS
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(self.cap, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+    def sleep(self, seconds, should_stop=None, step=0.25):
+        # Backoff that wakes every `step` seconds to check should_stop, so STOP
+        # does not wait out a 30 s Retry-After. False when it was stopped.
+        deadline = time.monotonic() + seconds
+        while True:
+            if should_stop and should_stop():
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(step, remaining))
+
+
+class CircuitBreaker:
+    # Pauses every worker once the host looks down. After `threshold` failures
+    # in a row the circuit opens for `cooldown` seconds; then a single probe is
+    # let through (half-open). A good probe closes it, a bad one reopens it with
+    # a doubled cooldown. Callers wait instead of failing, so no day is skipped.
+    def __init__(self, threshold=8, cooldown=15.0, max_cooldown=300.0):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.cond = threading.Condition()
+
+    def wait(self, should_stop=None):
+        # Blocks while the circuit is open. Returns True once the caller may send.
+        with self.cond:
+            while True:
+                if self.opened_at is None:
+                    return True
+                if should_stop and should_stop():
+                    return False
+                remaining = self.opened_at + self.cooldown - time.monotonic()
+                if remaining <= 0 and not self.probing:
+                    self.probing = True # Half-open: this caller is the probe
+                    return True
+                self.cond.wait(timeout=max(0.05, min(remaining, 1.0)) if remaining > 0 else 1.0)
+
+    def success(self):
+        with self.cond:
+            self.failures = 0
+            if self.opened_at is not None:
+                self.opened_at = None
+                self.probing = False
+                self.cooldown = self.base_cooldown
+                self.cond.notify_all()
+
+    def failure(self):
+        # Returns True when this failure opened (or reopened) the circuit
+        with self.cond:
+            self.failures += 1
+            if self.probing:
+                self.probing = False
+                self.opened_at = time.monotonic()
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                return True
+            if self.opened_at is None and self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class AdaptiveConcurrency:
+    # AIMD limit on requests in flight. Every `limit` healthy responses add one
+    # slot (additive increase, up to `ceiling`); an error, timeout or a response
+    # slower than `slow_after` seconds halves the limit (multiplicative decrease,
+    # at most once per `limit` completions so one burst only counts once).
+    def __init__(self, start=4, ceiling=None, floor=1, slow_after=3.0):
+        self.floor = max(1, int(floor))
+        self.slow_after = slow_after
+        self.cond = threading.Condition()
+        self.reset(start, ceiling)
+
+    def reset(self, start, ceiling=None):
+        with self.cond:
+            self.ceiling = max(self.floor, int(ceiling or start))
+            self.limit = min(self.ceiling, max(self.floor, int(start)))
+            self.active = 0
+            self.healthy = 0
+            self.since_cut = self.limit
+            self.cond.notify_all()
+
+    def acquire(self):
+        with self.cond:
+            while self.active >= self.limit:
+                self.cond.wait()
+            self.active += 1
+
+    def release(self, ok, latency=0.0):
+        with self.cond:
+            self.active -= 1
+            self.since_cut += 1
+            if ok and latency <= self.slow_after:
+                self.healthy += 1
+                if self.healthy >= self.limit and self.limit < self.ceiling:
+                    self.limit += 1
+                    self.healthy = 0
+            elif self.since_cut >= self.limit:
+                self.limit = max(self.floor, self.limit // 2)
+                self.healthy = 0
+                self.since_cut = 0
+            self.cond.notify_all()
+
+
+def fetch_ordered(func, items, workers=4, should_stop=None):
+    # Runs func(item) on a thread pool and yields (item, result) strictly in input
+    # order, so the yearly shards still come out sorted by date. Only a small
+    # window of calls is kept in flight, which lets STOP take effect quickly.
+    workers = max(1, int(workers))
+    window = workers * 2
+    pending = deque()
+    source = iter(items)
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while len(pending) < window:
+                if should_stop and should_stop():
+                    break
+                try:
+                    item = next(source)
+                except StopIteration:
+                    break
+                pending.append((item, pool.submit(func, item)))
+
+            if not pending:
+                break
+
+            item, future = pending.popleft()
+            yield item, future.result()
+
+            if should_stop and should_stop():
+                break
+    finally:
+        for _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
@@ -1,192 +1,34 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import requests
-from bs4 import BeautifulSoup, Comment
 import json
-import os
 import re
-import threading
-import time
 import webbrowser
-
-class HyenaScraper:
-    def __init__(self, log_callback=None):
-        self.base_url = "https://hyena.cz"
-        self.headers = {'User-Agent': 'HyleeArchiver/2.2'}
-        self.log = log_callback if log_callback else print
-        
-        self.archive_map = {
-            2026: "/", 
-            2025: "/inc/archiv20.htm",
-            2024: "/inc/archiv19.htm",
-            2023: "/inc/archiv18.htm",
-            2022: "/inc/archiv17.htm",
-            2021: "/inc/archiv16.htm",
-            2020: "/inc/archiv15.htm",
-            2019: "/inc/archiv14.htm",
-            2018: "/inc/archiv13.htm",
-            2017: "/inc/archiv12.htm",
-            2016: "/archiv11.htm",
-            2015: "/archiv10.htm",
-            2014: "/archiv9.htm",
-            2013: "/archiv8.htm",
-            2012: "/archiv7.htm",
-            2011: "/archiv6.htm",
-            2010: "/archiv5.html",
-            2009: "/archiv4.html",
-            2008: "/archiv3.html",
-            2007: "/archiv2.html",
-            2006: "/archiv2.html",
-            2005: "/archiv1.html",
-            2004: "/archiv1.html",
-            2003: "/archiv1.html"
-        }
-
-    def sanitize_text(self, text):
-        text = re.sub(r'<[^>]*>', '', text)
-        text = text.replace('&nbsp;', ' ')
-        text = text.replace('&amp;', '&')
-        text = text.replace('&quot;', '"')
-        return " ".join(text.split())
-
-    def get_daily_links(self, year_full):
-        year_int = int(year_full)
-        archive_path = self.archive_map.get(year_int, "/")
-        archive_url = f"{self.base_url}{archive_path}"
-        
-        self.log(f"Fetching calendar for {year_full}: {archive_url}")
-        
-        try:
-            r = requests.get(archive_url, headers=self.headers, timeout=10)
-            
-            try:
-                html_text = r.content.decode('utf-8')
-            except UnicodeDecodeError:
-                html_text = r.content.decode('windows-1250', errors='replace')
-                
-            if r.status_code != 200:
-                self.log(f"Failed to load calendar (Status: {r.status_code})")
-                return []
-            
-            soup = BeautifulSoup(html_text, 'html.parser')
-            links = []
-            year_short_str = str(year_full)[-2:] 
-            
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                match = re.search(r'(\d{2})\d{4}pes\.html?', href)
-                if match:
-                    link_year = match.group(1)
-                    if link_year == year_short_str:
-                        links.append(href)
-            
-            clean_links = []
-            for link in set(links):
-                if link.startswith('/'):
-                    clean_links.append(link)
-                else:
-                    clean_links.append(f"/{link}")
-            
-            clean_links.sort()
-            return clean_links
-        except Exception as e:
-            self.log(f"Error fetching calendar: {e}")
-            return []
-
-    def scrape_day(self, relative_path, do_sanitize=True):
-        url = f"{self.base_url}{relative_path}"
-        try:
-            r = requests.get(url, headers=self.headers, timeout=10)
-            if r.status_code != 200:
-                return None
-
-            try:
-                html_text = r.content.decode('utf-8')
-            except UnicodeDecodeError:
-                html_text = r.content.decode('windows-1250', errors='replace')
-
-            soup = BeautifulSoup(html_text, 'html.parser')
-            bullets = []
-            
-            start_node = soup.find(
-                string=lambda t: isinstance(t, Comment) and 'odsud' in t.lower()
-            )
-            
-            if start_node:
-                curr = start_node.next_element
-                text_buffer = []
-                html_tag_bypass = "<" + "!--"
-                
-                # Helper function to compile buffered text into a bullet
-                def flush_buffer():
-                    if not text_buffer: return False
-                    
-                    bullet = " ".join(text_buffer).strip()
-                    if do_sanitize: 
-                        bullet = self.sanitize_text(bullet)
-                    
-                    text_buffer.clear()
-                    
-                    if len(bullet) > 5 and not bullet.startswith(html_tag_bypass):
-                        if "Pokud vám nějaká zpráva přijde debilní" in bullet:
-                            return True # Kill switch
-                            
-                        b_lower = bullet.lower()
-                        if "facebook.com" not in b_lower and "digineff.cz" not in b_lower:
-                            bullets.append(bullet)
-                            
-                            # WEATHER KILL-SWITCH
-                            weather_prefixes = [
-                                "počasí", "u nás", "mrazy", "slunečn", "zataženo", 
-                                "oblačno", "jasno", "dnes", "čeká se", "ráno lilo"
-                            ]
-                            if any(b_lower.startswith(w) for w in weather_prefixes) or \
-                               "počasí v praze" in b_lower or "počasí praha" in b_lower:
-                                return True # Stop parsing immediately
-                    return False
-
-                # Linear Token Stream Parser
-                while curr:
-                    curr_name = getattr(curr, 'name', '')
-                    
-                    # 1. STOP CONDITIONS (Legacy comments)
-                    if isinstance(curr, Comment):
-                        c_text = curr.lower()
-                        if 'konec' in c_text or ('xxxxxxxx' in c_text and 'odsud' not in c_text):
-                            flush_buffer()
-                            break
-                            
-                    # 2. STOP CONDITIONS (Major structural shifts)
-                    if curr_name in ['table', 'div']:
-                        flush_buffer()
-                        break
-                    if curr_name == 'font' and curr.get('color') == 'navy':
-                        flush_buffer()
-                        break
-
-                    # 3. BULLET SPLITTERS (Flush buffer on new lines)
-                    if curr_name in ['li', 'br', 'p', 'ul', 'ol', 'hr']:
-                        if flush_buffer():
-                            break
-
-                    # 4. COLLECT PURE TEXT (Ignores formatting tags like <b>)
-                    if type(curr).__name__ == 'NavigableString':
-                        t = str(curr).strip()
-                        if t:
-                            text_buffer.append(t)
-                            
-                    curr = curr.next_element
-                    
-                # Final flush for the last item
-                flush_buffer()
-                
-            return bullets
-        except Exception as e:
-            self.log(f"Error scraping {url}: {e}")
-            return None
-
+from collections import deque
+
+# Only light modules here: requests, BeautifulSoup and the process pool are
+# pulled in by hylee_core on the first fetch, after the window is up
+from hylee_core import HyenaScraper
+from hylee_jobs import JobScheduler, INTERACTIVE, BATCH
+from hylee_rules import load_rulebook
+from hylee_publish import update_indexes
+from hylee_search import SearchIndex
+from hylee_store import DB_FILE, open_store
+from hylee_events import events
+from hylee_shards import (
+    pending_links, merge_days, link_date, describe_diff,
+    ShardJournal, load_run_state, save_run_state, clear_run_state
+)
 
 class HyleeGUI:
+    # Log pump: worker threads append to a bounded ring, the Tk loop drains it
+    # LOG_FRAME_MS apart in one insert, and the widget keeps the last LOG_MAX_LINES
+    LOG_FRAME_MS = 50
+    LOG_MAX_LINES = 2000
+    # Batch preview renders one page of days at a time instead of a whole year
+    PREVIEW_DAYS = 7
+    # Job panel refresh
+    JOBS_FRAME_MS = 500
+
     def __init__(self, root):
         self.root = root
         self.root.title("Hyena Leecher - Archive Manager v2.2")
@@ -196,9 +38,20 @@ class HyleeGUI:
         self.scraper = HyenaScraper(log_callback=self.log)
         self.current_data = {}
         self.current_year = ""
-        self.stop_flag = False
+        # Every button submits a job; interactive jobs run ahead of batch work
+        self.jobs = JobScheduler(workers=3)
+        self.batch_job = None
+        # Offline explorer: local stores by kind, and year nodes not expanded yet
+        self.local_stores = {}
+        self.tree_years = {}
+        self.log_ring = deque(maxlen=self.LOG_MAX_LINES)
+        self.preview_data = {}
+        self.preview_keys = []
+        self.preview_page = 0
 
         self.build_ui()
+        self._pump_log()
+        self._refresh_jobs()
 
     def build_ui(self):
         main_frame = tk.Frame(self.root, bg="#f0f0f0")
@@ -223,9 +76,22 @@ class HyleeGUI:
         self.limit_entry.insert(0, "0")
         self.limit_entry.grid(row=1, column=1, padx=5, sticky="w", pady=2)
 
+        tk.Label(config_frame, text="Workers:", bg="#f0f0f0").grid(row=2, column=0, sticky="w", pady=2)
+        self.workers_entry = tk.Entry(config_frame, width=8)
+        self.workers_entry.insert(0, "4")
+        self.workers_entry.grid(row=2, column=1, padx=5, sticky="w", pady=2)
+
         self.clean_var = tk.BooleanVar(value=True)
-        tk.Checkbutton(config_frame, text="Sanitize HTML", variable=self.clean_var, bg="#f0f0f0").grid(row=2, columnspan=2, sticky="w", pady=(5,0))
-        tk.Label(config_frame, text="(Formats: 2025, 2010-2015, ALL)", bg="#f0f0f0", fg="gray", font=("Arial", 8)).grid(row=3, columnspan=2, sticky="w")
+        tk.Checkbutton(config_frame, text="Sanitize HTML", variable=self.clean_var, bg="#f0f0f0").grid(row=3, columnspan=2, sticky="w", pady=(5,0))
+        self.incremental_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(config_frame, text="Incremental (missing days only)", variable=self.incremental_var, bg="#f0f0f0").grid(row=4, columnspan=2, sticky="w")
+        self.stream_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(config_frame, text="Stream engine (fast)", variable=self.stream_var, bg="#f0f0f0").grid(row=5, columnspan=2, sticky="w")
+        self.sqlite_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(config_frame, text=f"SQLite store ({DB_FILE})", variable=self.sqlite_var, bg="#f0f0f0").grid(row=6, columnspan=2, sticky="w")
+        self.offline_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(config_frame, text="Explorer from local shards", variable=self.offline_var, bg="#f0f0f0").grid(row=7, columnspan=2, sticky="w")
+        tk.Label(config_frame, text="(Formats: 2025, 2010-2015, ALL)", bg="#f0f0f0", fg="gray", font=("Arial", 8)).grid(row=8, columnspan=2, sticky="w")
 
         self.btn_load_tree = tk.Button(left_col, text="1. LOAD YEAR TO EXPLORER", bg="#8e44ad", fg="white", font=("Arial", 9, "bold"), command=self.load_calendar_to_tree)
         self.btn_load_tree.pack(fill="x", pady=(10, 5))
@@ -239,6 +105,9 @@ class HyleeGUI:
         self.btn_stop = tk.Button(btn_frame, text="STOP", bg="#c0392b", fg="white", font=("Arial", 9, "bold"), height=2, state="disabled", command=self.trigger_stop)
         self.btn_stop.pack(side="right", fill="x", expand=True, padx=(5, 0))
 
+        self.btn_resume = tk.Button(left_col, text="RESUME LAST RUN", bg="#16a085", fg="white", font=("Arial", 9, "bold"), command=self.resume_leech_thread)
+        self.btn_resume.pack(fill="x", pady=(0, 5))
+
         tk.Label(left_col, text="System Log:", bg="#f0f0f0").pack(anchor="w", pady=(5, 0))
         self.log_widget = scrolledtext.ScrolledText(left_col, height=15, bg="black", fg="#00ff00", font=("Consolas", 9))
         self.log_widget.pack(fill="both", expand=True)
@@ -255,6 +124,8 @@ class HyleeGUI:
         tree_scroll = ttk.Scrollbar(mid_col, orient="vertical", command=self.tree.yview)
         tree_scroll.pack(side="right", fill="y")
         self.tree.configure(yscrollcommand=tree_scroll.set)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
+        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
         
         self.btn_open_browser = tk.Button(mid_col, text="Open Link in Browser", command=self.open_in_browser)
         self.btn_open_browser.pack(fill="x", pady=2)
@@ -262,12 +133,33 @@ class HyleeGUI:
         self.btn_parse_single = tk.Button(mid_col, text="Parse Selected Day", bg="#27ae60", fg="white", font=("Arial", 9, "bold"), command=self.parse_single_day)
         self.btn_parse_single.pack(fill="x", pady=2)
 
+        jobs_frame = tk.LabelFrame(mid_col, text=" Jobs ", bg="#f0f0f0")
+        jobs_frame.pack(fill="x", pady=(5, 0))
+        self.jobs_list = tk.Listbox(jobs_frame, height=7, font=("Consolas", 8), activestyle="none")
+        self.jobs_list.pack(fill="x", padx=2, pady=2)
+        self.jobs_ids = []
+        tk.Button(jobs_frame, text="Cancel Selected Job", command=self.cancel_selected_job).pack(fill="x", padx=2, pady=(0, 2))
+
         # ---------------- RIGHT COLUMN (Preview) ----------------
         right_col = tk.Frame(main_frame, bg="#ffffff", bd=1, relief="sunken")
         right_col.pack(side="right", fill="both", expand=True)
 
         tk.Label(right_col, text=" JSON OUTPUT PREVIEW ", bg="#34495e", fg="white", font=("Arial", 10, "bold")).pack(fill="x")
+
+        search_frame = tk.Frame(right_col, bg="#ffffff")
+        search_frame.pack(fill="x", padx=5, pady=5)
+        self.search_entry = tk.Entry(search_frame)
+        self.search_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.search_entry.bind("<Return>", lambda e: self.run_search())
+        tk.Button(search_frame, text="Search", bg="#34495e", fg="white", font=("Arial", 9, "bold"), command=self.run_search).pack(side="right")
         
+        nav_frame = tk.Frame(right_col, bg="#ffffff")
+        nav_frame.pack(side="bottom", fill="x", padx=5, pady=2)
+        tk.Button(nav_frame, text="< Prev", command=lambda: self.turn_preview_page(-1)).pack(side="left")
+        tk.Button(nav_frame, text="Next >", command=lambda: self.turn_preview_page(1)).pack(side="right")
+        self.preview_label = tk.Label(nav_frame, text="", bg="#ffffff", fg="gray")
+        self.preview_label.pack(side="left", expand=True)
+
         self.preview_text = scrolledtext.ScrolledText(right_col, bg="#ffffff", fg="#333333", font=("Consolas", 10), state="normal")
         self.preview_text.pack(fill="both", expand=True)
 
@@ -275,38 +167,213 @@ class HyleeGUI:
 
     # --- UI HELPERS ---
     def log(self, msg):
-        self.log_widget.after(0, self._log_insert, msg)
+        # Safe from any thread; shown on the next log frame
+        self.log_ring.append(msg)
+
+    def _pump_log(self):
+        lines = []
+        while self.log_ring:
+            lines.append(f"> {self.log_ring.popleft()}\n")
+        if lines:
+            self.log_widget.insert(tk.END, "".join(lines))
+            excess = int(self.log_widget.index("end-1c").split(".")[0]) - self.LOG_MAX_LINES
+            if excess > 0:
+                self.log_widget.delete("1.0", f"{excess + 1}.0")
+            self.log_widget.see(tk.END)
+        self.root.after(self.LOG_FRAME_MS, self._pump_log)
+
+    def show_preview(self, data):
+        # Keeps the year and renders only its first page of days
+        self.preview_data = data
+        self.preview_keys = sorted(data)
+        self.preview_page = 0
+        self.render_preview_page()
+
+    def turn_preview_page(self, step):
+        pages = max(1, -(-len(self.preview_keys) // self.PREVIEW_DAYS))
+        self.preview_page = min(max(self.preview_page + step, 0), pages - 1)
+        self.render_preview_page()
+
+    def render_preview_page(self):
+        if not self.preview_keys:
+            self.preview_label.config(text="")
+            return
+        start = self.preview_page * self.PREVIEW_DAYS
+        keys = self.preview_keys[start:start + self.PREVIEW_DAYS]
+        page = {k: self.preview_data[k] for k in keys}
+        self.preview_text.delete("1.0", tk.END)
+        self.preview_text.insert(tk.END, json.dumps(page, ensure_ascii=False, indent=2))
+        self.preview_label.config(text=f"{keys[0]} .. {keys[-1]}  ({start + len(keys)}/{len(self.preview_keys)} days)")
 
-    def _log_insert(self, msg):
-        self.log_widget.insert(tk.END, f"> {msg}\n")
-        self.log_widget.see(tk.END)
+    def clear_preview(self):
+        self.preview_data = {}
+        self.preview_keys = []
+        self.preview_label.config(text="")
+        self.preview_text.delete("1.0", tk.END)
+
+    def _refresh_jobs(self):
+        # Redraws the job panel only when a line changed, keeping the selection
+        jobs = self.jobs.snapshot()
+        lines = [job.describe() for job in jobs]
+        if lines != list(self.jobs_list.get(0, tk.END)):
+            selected = [self.jobs_ids[i] for i in self.jobs_list.curselection() if i < len(self.jobs_ids)]
+            self.jobs_list.delete(0, tk.END)
+            for line in lines:
+                self.jobs_list.insert(tk.END, line)
+            self.jobs_ids = [job.id for job in jobs]
+            for job_id in selected:
+                if job_id in self.jobs_ids:
+                    self.jobs_list.selection_set(self.jobs_ids.index(job_id))
+        # The buttons come back only once the batch job has finished, i.e. its
+        # "batch" key is released: a click before that would be merged into it.
+        # This also covers a batch cancelled before it started, or crashed.
+        if self.batch_job and self.batch_job.finished.is_set():
+            if self.batch_job.error:
+                self.log(f"[CRITICAL ERROR] Batch job failed: {self.batch_job.error}")
+            self.batch_job = None
+            self.reset_buttons()
+        self.root.after(self.JOBS_FRAME_MS, self._refresh_jobs)
+
+    def cancel_selected_job(self):
+        for i in self.jobs_list.curselection():
+            job = self.jobs.find(self.jobs_ids[i]) if i < len(self.jobs_ids) else None
+            if job and not job.finished.is_set():
+                self.log(f"Cancelling job #{job.id}: {job.name}")
+                job.cancel()
 
     def trigger_stop(self):
-        self.log("Stop requested... finishing current task.")
-        self.stop_flag = True
+        if self.batch_job:
+            self.log("Stop requested... finishing current task.")
+            self.batch_job.cancel()
 
     def reset_buttons(self):
         def _reset():
             self.btn_leech.config(state="normal", text="2. BATCH LEECH")
+            self.btn_resume.config(state="normal")
             self.btn_stop.config(state="disabled")
         self.root.after(0, _reset)
 
+    # --- SEARCH ---
+    def run_search(self):
+        query = self.search_entry.get().strip()
+        if not query:
+            return
+        self.jobs.submit(f"Search '{query}'", lambda job: self._search_and_display(query),
+                         INTERACTIVE, key=("search", query))
+
+    def _search_and_display(self, query):
+        if not SearchIndex().available():
+            self.log("No search index yet. Run a batch leech or 'python hylee.py publish' first.")
+            return
+        store = open_store("sqlite" if self.sqlite_var.get() else "json")
+        results = SearchIndex(load_year=store.load_year).search(query, limit=200)
+        store.close()
+        self.log(f"Search '{query}': {len(results)} result(s).")
+
+        def _update_ui():
+            self.clear_preview()
+            for date_str, bullet in results:
+                self.preview_text.insert(tk.END, f"{date_str}  {bullet}\n")
+        self.root.after(0, _update_ui)
+
     # --- EXPLORER LOGIC ---
+    def explorer_store(self):
+        # The store the SQLite checkbox selects, kept open for the explorer
+        kind = "sqlite" if self.sqlite_var.get() else "json"
+        if kind not in self.local_stores:
+            self.local_stores[kind] = open_store(kind)
+        return self.local_stores[kind]
+
     def load_calendar_to_tree(self):
-        year_input = self.year_entry.get().strip()
-        if not year_input.isdigit() or len(year_input) != 4:
-            messagebox.showerror("Error", "Please enter a single 4-digit year to load into the explorer.")
+        year_input = self.year_entry.get().strip().upper()
+        if year_input != "ALL" and (not year_input.isdigit() or len(year_input) != 4):
+            messagebox.showerror("Error", "Please enter a single 4-digit year (or ALL for every local shard) to load into the explorer.")
+            return
+
+        # Local shards first: no network, and a day is only decoded when selected
+        if self.offline_var.get():
+            local = [y for y in self.explorer_store().years() if year_input == "ALL" or str(y) == year_input]
+            if local:
+                self.populate_local_tree(local)
+                return
+            self.log(f"No local days for {year_input}, asking hyena.cz.")
+        if year_input == "ALL":
+            messagebox.showerror("Error", "ALL only works with local shards. Enter a single year to load it from hyena.cz.")
+            return
+
+        job, merged = self.jobs.submit(f"Explorer {year_input}", lambda job: self._fetch_and_populate_tree(year_input),
+                                       INTERACTIVE, key=("calendar", year_input))
+        if merged:
+            self.log(f"Calendar for {year_input} is already loading (job #{job.id}).")
             return
-            
         self.tree.delete(*self.tree.get_children())
+        self.tree_years = {}
         self.log(f"Loading calendar links for {year_input} into Explorer...")
-        
-        thread = threading.Thread(target=self._fetch_and_populate_tree, args=(year_input,))
-        thread.daemon = True
-        thread.start()
+
+    def populate_local_tree(self, years):
+        # One node per year; its months and days are inserted when it is opened
+        self.tree.delete(*self.tree.get_children())
+        self.tree_years = {}
+        for year in years:
+            node = self.tree.insert("", "end", text=f"Year: {year}", open=False)
+            self.tree.insert(node, "end", text="...")
+            self.tree_years[node] = year
+        if len(years) == 1:
+            self.expand_year(node)
+            self.tree.item(node, open=True)
+        store = self.explorer_store()
+        self.log(f"Explorer: {len(years)} year(s) from the local {store.name} store (offline).")
+
+    def on_tree_open(self, event):
+        node = self.tree.focus()
+        if node in self.tree_years:
+            self.expand_year(node)
+
+    def expand_year(self, node):
+        year = self.tree_years.pop(node)
+        self.tree.delete(*self.tree.get_children(node))
+        # The site's own links, where the calendar index already knows them; the
+        # URL scheme changed over the years, so a link is never built from a date
+        links = {link_date(link): link for link in self.scraper.calendar.year_links(year)}
+        months = {}
+        for date_str in self.explorer_store().list_days(year):
+            months.setdefault(date_str[:7], []).append(date_str)
+        for m_key in sorted(months):
+            month_node = self.tree.insert(node, "end", text=f"Month: {m_key}", open=False)
+            for date_str in months[m_key]:
+                self.tree.insert(month_node, "end", text=date_str, values=(links.get(date_str, ""), "local"))
+
+    def on_tree_select(self, event):
+        # Days of the offline tree show their stored bullets straight away
+        selected = self.tree.selection()
+        values = self.tree.item(selected[0])['values'] if selected else ()
+        if len(values) > 1 and values[1] == "local":
+            self.show_local_day(self.tree.item(selected[0])['text'])
+
+    def show_local_day(self, date_str):
+        # Decodes just this day from the store. False when it holds no such day.
+        if not self.offline_var.get():
+            return False
+        bullets = self.explorer_store().load_day(date_str)
+        if not bullets:
+            return False
+        self.clear_preview()
+        self.preview_text.insert(tk.END, json.dumps({date_str: bullets}, ensure_ascii=False, indent=2))
+        return True
+
+    def resolve_day_link(self, date_str):
+        # Link of a local day the calendar index did not know when its year was
+        # expanded: the index first, then the year's archive page. Worker thread.
+        links = self.scraper.calendar.year_links(date_str[:4])
+        if date_str not in map(link_date, links):
+            links = self.scraper.get_daily_links(date_str[:4], urgent=True)
+        link = next((l for l in links if link_date(l) == date_str), None)
+        if link is None:
+            self.log(f"hyena.cz lists no page for {date_str}.")
+        return link
         
     def _fetch_and_populate_tree(self, year_str):
-        links = self.scraper.get_daily_links(year_str)
+        links = self.scraper.get_daily_links(year_str, urgent=True)
         if not links:
             self.log(f"No links found for {year_str}.")
             return
@@ -333,6 +400,8 @@ class HyleeGUI:
         self.root.after(0, _update_ui)
 
     def get_selected_link(self):
+        # (date, link) of the selected day. The link is "" for a local day whose
+        # link is not known yet; (None, None) for a month or year node.
         selected = self.tree.selection()
         if not selected:
             return None, None
@@ -343,29 +412,49 @@ class HyleeGUI:
 
     def open_in_browser(self):
         date_str, link = self.get_selected_link()
+        if not date_str:
+            self.log("Please select a specific day (not a month folder) to open.")
+        elif link:
+            self._open_day(link)
+        else:
+            self.jobs.submit(f"Link {date_str}", lambda job: self._open_day(self.resolve_day_link(date_str)),
+                             INTERACTIVE, key=("link", date_str))
+
+    def _open_day(self, link):
         if link:
             full_url = f"{self.scraper.base_url}{link}"
             self.log(f"Opening browser: {full_url}")
             webbrowser.open(full_url)
-        else:
-            self.log("Please select a specific day (not a month folder) to open.")
 
     def parse_single_day(self):
         date_str, link = self.get_selected_link()
-        if not link:
+        if not date_str:
             self.log("Please select a specific day to parse.")
             return
             
-        self.log(f"Single Test Parsing: {date_str} ...")
-        self.preview_text.delete("1.0", tk.END)
+        if self.show_local_day(date_str):
+            self.log(f"{date_str} shown from {self.explorer_store().describe(date_str[:4])} (no network). "
+                     "Untick 'Explorer from local shards' to parse the live page.")
+            return
+
+        # The engine goes with the job: the shared scraper's engine belongs to
+        # whatever batch may be running
+        do_sanitize = self.clean_var.get()
+        engine = "stream" if self.stream_var.get() else "soup"
+        job, merged = self.jobs.submit(f"Parse {date_str}", lambda job: self._parse_and_display_single(date_str, link, do_sanitize, engine),
+                                       INTERACTIVE, key=("parse", date_str, do_sanitize, engine))
+        if merged:
+            self.log(f"{date_str} is already being parsed (job #{job.id}).")
+            return
+
+        self.log(f"Single Test Parsing: {date_str} ({engine} engine) ...")
+        self.clear_preview()
         self.preview_text.insert(tk.END, f"--- Fetching {date_str} ---\n\n")
-        
-        thread = threading.Thread(target=self._parse_and_display_single, args=(date_str, link, self.clean_var.get()))
-        thread.daemon = True
-        thread.start()
 
-    def _parse_and_display_single(self, date_str, link, do_sanitize):
-        bullets = self.scraper.scrape_day(link, do_sanitize)
+    def _parse_and_display_single(self, date_str, link, do_sanitize, engine):
+        # Urgent: jumps the request queue ahead of a running batch
+        link = link or self.resolve_day_link(date_str)
+        bullets = self.scraper.scrape_day(link, do_sanitize, urgent=True, engine=engine) if link else None
         
         def _update():
             if bullets is None:
@@ -402,25 +491,53 @@ class HyleeGUI:
             return
             
         max_days = int(limit_str) if limit_str.isdigit() else 0
-
-        self.stop_flag = False
+        workers_str = self.workers_entry.get().strip()
+        workers = int(workers_str) if workers_str.isdigit() and int(workers_str) > 0 else 1
+
+        options = {"sanitize": self.clean_var.get(), "max_days": max_days, "incremental": self.incremental_var.get(),
+                   "store": "sqlite" if self.sqlite_var.get() else "json"}
+        save_run_state({"years": valid_years, "done": [], "options": options})
+        self._start_batch(valid_years, options, workers, resume=False)
+
+    def resume_leech_thread(self):
+        state = load_run_state()
+        if not state:
+            messagebox.showinfo("Resume", "No interrupted batch run to resume.")
+            return
+        years = [y for y in state["years"] if y not in state["done"]]
+        workers_str = self.workers_entry.get().strip()
+        workers = int(workers_str) if workers_str.isdigit() and int(workers_str) > 0 else 1
+        self.log(f"Resuming interrupted run: {len(years)} year(s) left.")
+        self._start_batch(years, state["options"], workers, resume=True)
+
+    def _start_batch(self, years, options, workers, resume):
+        self.scraper.engine = "stream" if self.stream_var.get() else "soup"
         self.btn_leech.config(state="disabled", text="LEECHING...")
+        self.btn_resume.config(state="disabled")
         self.btn_stop.config(state="normal")
-        self.preview_text.delete("1.0", tk.END)
-        
-        thread = threading.Thread(target=self.run_batch_scraper, args=(valid_years, self.clean_var.get(), max_days))
-        thread.daemon = True
-        thread.start()
+        self.clear_preview()
+
+        label = f"{years[0]}-{years[-1]}" if len(years) > 1 else f"{years[0]}" if years else "resume"
+        self.batch_job, _ = self.jobs.submit(f"Batch {label}", lambda job: self.run_batch_scraper(years, options, workers, resume, job),
+                                             BATCH, key="batch")
+
+    def run_batch_scraper(self, valid_years, options, workers=1, resume=False, job=None):
+        stopped = job.should_stop if job else (lambda: False)
+        do_sanitize = options.get("sanitize", True)
+        max_days = options.get("max_days", 0)
+        incremental = options.get("incremental", False)
+        store = open_store(options.get("store", "json"))
+        state = load_run_state() or {"years": valid_years, "done": [], "options": options}
 
-    def run_batch_scraper(self, valid_years, do_sanitize, max_days):
         self.log(f"Starting batch queue for {len(valid_years)} year(s)...")
         
         for year in valid_years:
-            if self.stop_flag: break
+            if stopped(): break
                 
             self.log(f"\n--- INITIATING CRAWL: {year} ---")
             self.current_year = str(year)
-            self.current_data = {}
+            if job:
+                job.note = f"year {year}"
             
             links = self.scraper.get_daily_links(year)
             if not links:
@@ -428,17 +545,42 @@ class HyleeGUI:
                 continue
 
             self.log(f"Found {len(links)} daily links for {year}.")
+
+            # Days already journaled by the interrupted run are not fetched again
+            journal = ShardJournal(year)
+            journal_days, processed = journal.replay() if resume else ({}, set())
+            links = [link for link in links if link_date(link) not in processed]
+            self.current_data = dict(journal_days)
+
+            existing = {}
+            if incremental:
+                existing = store.load_year(year)
+                links = pending_links(links, existing)
+                if not links and not journal_days:
+                    self.log(f"Up to date: {len(existing)} days already in {store.describe(year)}.")
+                    journal.remove()
+                    state["done"].append(year)
+                    save_run_state(state)
+                    continue
+                self.log(f"Incremental: {len(existing)} days on disk, fetching {len(links)} missing.")
+            if processed:
+                self.log(f"Resume: {len(processed)} days already journaled, fetching {len(links)} more.")
             
-            days_processed = 0
-            for link in links:
-                if self.stop_flag: break
-                    
-                match = re.search(r'(\d{2})(\d{2})(\d{2})pes', link)
-                if match:
-                    date_str = f"20{match.group(1)}-{match.group(2)}-{match.group(3)}"
-                    self.log(f"Scraping: {date_str}")
-                    
-                    bullets = self.scraper.scrape_day(link, do_sanitize)
+            hit_limit = max_days > 0 and len(links) > max_days
+            if hit_limit:
+                links = links[:max_days]
+
+            if job:
+                job.total += len(links)
+            journal.open(resume=resume)
+            batch = self.scraper.scrape_many(links, do_sanitize, workers=workers, should_stop=stopped)
+            try:
+                for link, bullets in batch:
+                    # Per-day results go to the event log (hylee_events.jsonl), not the console
+                    date_str = link_date(link)
+                    journal.append(date_str, bullets)
+                    if job:
+                        job.advance()
                     
                     if bullets is None:
                         self.log(f"[ERROR] Failed to fetch {date_str}")
@@ -446,34 +588,54 @@ class HyleeGUI:
                         self.log(f"[WARNING] 0 bullets extracted for {date_str}.")
                     else:
                         self.current_data[date_str] = bullets
-                        
-                    days_processed += 1
-                    if max_days > 0 and days_processed >= max_days:
-                        self.log(f"--- Reached limit ({max_days} days) ---")
-                        break
-                    
-                    time.sleep(0.2) 
+            finally:
+                journal.close()
+
+            # A stopped year is not compacted: a partial year would replace the full
+            # shard. Its journal stays the only record so RESUME can finish it.
+            if stopped():
+                self.log(f"Journal kept for {year}. Use RESUME LAST RUN to continue.")
+                break
+
+            if hit_limit:
+                self.log(f"--- Reached limit ({max_days} days) ---")
 
             if self.current_data:
-                sorted_data = dict(sorted(self.current_data.items()))
+                sorted_data = merge_days(existing, self.current_data)
                 
-                def _update_ui(data):
-                    self.preview_text.delete("1.0", tk.END)
-                    self.preview_text.insert(tk.END, json.dumps(data, ensure_ascii=False, indent=2))
-                self.root.after(0, _update_ui, sorted_data)
+                self.root.after(0, self.show_preview, sorted_data)
                 
-                filename = f"hyena_{self.current_year}.json"
+                filename = store.describe(year)
                 try:
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        json.dump(sorted_data, f, ensure_ascii=False, indent=2)
-                    self.log(f"AUTO-SAVED: {filename}")
+                    # Incremental runs only add days; a backend that can upsert writes just those
+                    diff = store.save_year(year, sorted_data, changed=list(self.current_data) if incremental else None)
                 except Exception as e:
                     self.log(f"[CRITICAL ERROR] Failed to save {filename}: {e}")
-
-        if not self.stop_flag:
+                    continue
+                if diff is None:
+                    events.emit("write", file=filename, status="unchanged", days=len(sorted_data))
+                    self.log(f"UNCHANGED: {filename}, not rewritten")
+                else:
+                    events.emit("write", file=filename, status="changed", days=len(sorted_data),
+                                added=len(diff.added), changed=len(diff.changed), removed=len(diff.removed))
+                    self.log(f"AUTO-SAVED: {filename} ({describe_diff(diff)})")
+                    try:
+                        update_indexes(year, sorted_data)
+                    except Exception as e:
+                        self.log(f"[ERROR] Published indexes not updated for {year}: {e}")
+
+            journal.remove()
+            state["done"].append(year)
+            save_run_state(state)
+
+        store.close()
+        hits = load_rulebook().take_hits()
+        if hits:
+            self.log("Rule hits: " + ", ".join(f"{name} x{count}" for name, count in hits.most_common()))
+
+        if not stopped():
+            clear_run_state()
             self.log("\n+++ BATCH SCRAPING COMPLETE +++")
-        self.reset_buttons()
-
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,162 @@
+import heapq
+import itertools
+import threading
+import time
+
+# JOB SCHEDULER for the GUI. Every button submits a Job instead of starting its
+# own thread. Jobs wait in one priority queue served by a small worker pool:
+# explorer lookups, single-day parses and searches (INTERACTIVE) are picked up
+# ahead of queued batch work, and batch jobs may hold at most workers - 1
+# threads, so one worker is always free for interactive work. A job submitted
+# with the key of a job still queued or running is merged into that job. Every
+# job has its own cancel flag and progress counters for the GUI's job panel.
+INTERACTIVE = 0
+BATCH = 10
+HISTORY = 20 # Finished jobs kept for the panel
+
+
+class Job:
+    def __init__(self, job_id, name, func, priority, key):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.priority = priority
+        self.key = key
+        self.state = "queued" # queued, running, done, failed, cancelled
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.done = 0
+        self.total = 0
+        self.note = ""
+        self.started = None
+        self.ended = None
+        self.result = None
+        self.error = None
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def should_stop(self):
+        return self.cancelled.is_set()
+
+    def advance(self, n=1):
+        self.done += n
+
+    def rate(self):
+        # Units per second since the job started
+        if self.started is None:
+            return 0.0
+        elapsed = (self.ended or time.monotonic()) - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        # Seconds left for the known work, or None
+        rate = self.rate()
+        if not rate or not self.total or self.ended:
+            return None
+        return max(0, self.total - self.done) / rate
+
+    def describe(self):
+        state = "cancelling" if self.state == "running" and self.should_stop() else self.state
+        parts = [f"#{self.id} {self.name}", state]
+        if self.total:
+            parts.append(f"{self.done}/{self.total}")
+        if self.started is not None and self.done:
+            parts.append(f"{self.rate():.1f}/s")
+        eta = self.eta()
+        if eta is not None:
+            parts.append(f"ETA {int(eta) // 60}:{int(eta) % 60:02d}")
+        if self.note:
+            parts.append(self.note)
+        return "  ".join(parts)
+
+
+class JobScheduler:
+    def __init__(self, workers=3):
+        self.workers = max(2, int(workers))
+        self.cond = threading.Condition()
+        self.queue = [] # heap of (priority, seq, job)
+        self.seq = itertools.count()
+        self.ids = itertools.count(1)
+        self.jobs = []
+        self.inflight = {}
+        self.running_batch = 0
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+
+    def submit(self, name, func, priority=BATCH, key=None):
+        # func(job) runs on a worker thread. Returns (job, merged).
+        with self.cond:
+            existing = self.inflight.get(key) if key is not None else None
+            if existing and not existing.should_stop():
+                return existing, True
+            job = Job(next(self.ids), name, func, priority, key)
+            heapq.heappush(self.queue, (priority, next(self.seq), job))
+            if key is not None:
+                self.inflight[key] = job
+            self.jobs.append(job)
+            self._trim()
+            self.cond.notify_all()
+        return job, False
+
+    def snapshot(self):
+        # Running jobs, then queued ones in the order they will run, then the
+        # most recent finished ones
+        with self.cond:
+            jobs = list(self.jobs)
+        order = {"running": 0, "queued": 1}
+        return sorted(jobs, key=lambda j: (order.get(j.state, 2), j.priority if j.state == "queued" else 0,
+                                           j.id if j.state in order else -j.id))
+
+    def find(self, job_id):
+        with self.cond:
+            return next((j for j in self.jobs if j.id == job_id), None)
+
+    def _trim(self):
+        finished = [j for j in self.jobs if j.finished.is_set()]
+        for job in finished[:max(0, len(finished) - HISTORY)]:
+            self.jobs.remove(job)
+
+    def _next(self):
+        # Called with self.cond held. The head of the heap is the most urgent
+        # job; batch work waits while it would take the last free worker.
+        while True:
+            if self.queue:
+                priority, _, job = self.queue[0]
+                if priority < BATCH or self.running_batch < self.workers - 1:
+                    heapq.heappop(self.queue)
+                    return job
+            self.cond.wait()
+
+    def _work(self):
+        while True:
+            with self.cond:
+                job = self._next()
+                batch = job.priority >= BATCH
+                if batch:
+                    self.running_batch += 1
+                job.state = "running"
+                job.started = time.monotonic()
+
+            state = "cancelled"
+            try:
+                if not job.should_stop():
+                    job.result = job.func(job)
+                    state = "cancelled" if job.should_stop() else "done"
+            except Exception as e:
+                job.error = e
+                job.note = f"{type(e).__name__}: {e}"
+                state = "failed"
+
+            with self.cond:
+                if batch:
+                    self.running_batch -= 1
+                if job.key is not None and self.inflight.get(job.key) is job:
+                    del self.inflight[job.key]
+                job.state = state
+                job.ended = time.monotonic()
+                job.finished.set()
+                self._trim()
+                self.cond.notify_all()
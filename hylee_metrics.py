@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from hylee_cache import atomic_write
+
+# RUN INSTRUMENTATION: wall time per stage (with a histogram), bytes moved and
+# plain counters, overall and per year. Stages:
+#   fetch    network round-trip of one request (cache hits are counted, not timed)
+#   decode   utf-8 attempt / windows-1250 fallback and anchor window decode
+#   parse    BeautifulSoup tree build
+#   extract  token walk and rules (the stream engine parses and extracts in one
+#            pass, so all of its time lands here)
+#   write    shard / database write
+# Worker processes keep their own Metrics; take() / merge() carry their numbers
+# back to the parent, the same way rule hits travel.
+STAGES = ("fetch", "decode", "parse", "extract", "write")
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _new_stage():
+    return {"count": 0, "seconds": 0.0, "max": 0.0, "buckets": [0] * (len(BUCKETS_MS) + 1)}
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.counters = {}
+            self.years = {}
+
+    def record(self, stage, seconds, year=None):
+        ms = seconds * 1000
+        with self.lock:
+            s = self.stages.setdefault(stage, _new_stage())
+            s["count"] += 1
+            s["seconds"] += seconds
+            s["max"] = max(s["max"], seconds)
+            s["buckets"][next((i for i, b in enumerate(BUCKETS_MS) if ms <= b), len(BUCKETS_MS))] += 1
+            if year is not None:
+                y = self.years.setdefault(str(year), {"seconds": {}, "counters": {}})
+                y["seconds"][stage] = y["seconds"].get(stage, 0.0) + seconds
+
+    def count(self, name, n=1, year=None):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            if year is not None:
+                y = self.years.setdefault(str(year), {"seconds": {}, "counters": {}})
+                y["counters"][name] = y["counters"].get(name, 0) + n
+
+    @contextmanager
+    def stage(self, name, year=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, year)
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps({"stages": self.stages, "counters": self.counters, "years": self.years}))
+
+    def take(self):
+        # Snapshot and reset: what a worker process hands back with each result
+        snap = self.snapshot()
+        self.reset()
+        return snap
+
+    def merge(self, snap):
+        with self.lock:
+            for stage, other in snap.get("stages", {}).items():
+                s = self.stages.setdefault(stage, _new_stage())
+                s["count"] += other["count"]
+                s["seconds"] += other["seconds"]
+                s["max"] = max(s["max"], other["max"])
+                s["buckets"] = [a + b for a, b in zip(s["buckets"], other["buckets"])]
+            for name, n in snap.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            for year, other in snap.get("years", {}).items():
+                y = self.years.setdefault(year, {"seconds": {}, "counters": {}})
+                for k, v in other["seconds"].items():
+                    y["seconds"][k] = y["seconds"].get(k, 0.0) + v
+                for k, v in other["counters"].items():
+                    y["counters"][k] = y["counters"].get(k, 0) + v
+
+    def report(self, rule_hits=None):
+        snap = self.snapshot()
+        snap["buckets_ms"] = list(BUCKETS_MS)
+        snap["rule_hits"] = dict(rule_hits or {})
+        return snap
+
+    def prometheus(self, rule_hits=None):
+        snap = self.report(rule_hits)
+        lines = [
+            "# HELP hylee_stage_seconds Wall time per pipeline stage.",
+            "# TYPE hylee_stage_seconds histogram",
+        ]
+        for stage, s in sorted(snap["stages"].items()):
+            cumulative = 0
+            for bound, n in zip(list(BUCKETS_MS) + ["+Inf"], s["buckets"]):
+                cumulative += n
+                le = bound if bound == "+Inf" else f"{bound / 1000:g}"
+                lines.append(f'hylee_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'hylee_stage_seconds_sum{{stage="{stage}"}} {s["seconds"]:.6f}')
+            lines.append(f'hylee_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+        lines.append("# TYPE hylee_events_total counter")
+        for name, n in sorted(snap["counters"].items()):
+            lines.append(f'hylee_events_total{{event="{name}"}} {n}')
+        lines.append("# TYPE hylee_year_stage_seconds_total counter")
+        for year, y in sorted(snap["years"].items()):
+            for stage, seconds in sorted(y["seconds"].items()):
+                lines.append(f'hylee_year_stage_seconds_total{{year="{year}",stage="{stage}"}} {seconds:.6f}')
+        lines.append("# TYPE hylee_rule_hits_total counter")
+        for name, n in sorted(snap["rule_hits"].items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'hylee_rule_hits_total{{rule="{label}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path, rule_hits=None):
+        # .prom -> Prometheus textfile format, anything else -> JSON
+        if path.endswith(".prom"):
+            data = self.prometheus(rule_hits)
+        else:
+            data = json.dumps(self.report(rule_hits), ensure_ascii=False, indent=1)
+        atomic_write(path, data.encode("utf-8"))
+
+    def summary(self):
+        # Short text table for the end of a CLI run
+        snap = self.snapshot()
+        lines = []
+        for stage in STAGES:
+            s = snap["stages"].get(stage)
+            if s and s["count"]:
+                lines.append(f"  {stage:<8} {s['count']:>7} x  {s['seconds']:8.2f} s total  "
+                             f"{s['seconds'] / s['count'] * 1000:8.1f} ms avg  {s['max'] * 1000:8.1f} ms max")
+        for name, n in sorted(snap["counters"].items()):
+            lines.append(f"  {name:<18} {n}")
+        return "\n".join(lines)
+
+
+# One per process
+metrics = Metrics()
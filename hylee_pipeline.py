@@ -0,0 +1,84 @@
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+_DONE = object()
+
+
+def _chain(source, target):
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def run_pipeline(fetch, extract, links, io_workers=4, cpu_workers=None, max_pending=64, should_stop=None):
+    # Staged fetch/parse pipeline for full re-extraction runs:
+    #   1. I/O threads run fetch(link) -> raw bytes (or None)
+    #   2. a process pool runs extract(link, raw bytes) on every core
+    #   3. the caller consumes (link, result) in input order as the single writer
+    # At most max_pending pages sit between stage 1 and the writer; once that
+    # many are waiting, fetching blocks until the writer catches up, so memory
+    # stays flat on a 5,900-page run. `extract` must be picklable. A failed
+    # stage yields the exception instance as the result.
+    slots = threading.BoundedSemaphore(max_pending)
+    ordered = queue.Queue()
+    halt = threading.Event()
+    io_pool = ThreadPoolExecutor(max_workers=max(1, int(io_workers)))
+    cpu_pool = ProcessPoolExecutor(max_workers=cpu_workers or None)
+
+    def _to_parser(link, out):
+        def _fetched(fetch_future):
+            if fetch_future.cancelled():
+                out.cancel()
+                return
+            if fetch_future.exception() is not None:
+                out.set_exception(fetch_future.exception())
+                return
+            content = fetch_future.result()
+            if content is None:
+                out.set_result(None)
+                return
+            try:
+                cpu_pool.submit(extract, link, content).add_done_callback(lambda f: _chain(f, out))
+            except RuntimeError as e: # Pool already shut down
+                out.set_exception(e)
+        return _fetched
+
+    def _feeder():
+        try:
+            for link in links:
+                while not slots.acquire(timeout=0.1):
+                    if halt.is_set():
+                        return
+                if halt.is_set() or (should_stop and should_stop()):
+                    break
+                out = Future()
+                io_pool.submit(fetch, link).add_done_callback(_to_parser(link, out))
+                ordered.put((link, out))
+        finally:
+            ordered.put(_DONE)
+
+    feeder = threading.Thread(target=_feeder, daemon=True)
+    feeder.start()
+    try:
+        while True:
+            item = ordered.get()
+            if item is _DONE:
+                break
+            link, out = item
+            try:
+                result = out.result()
+            except BaseException as e:
+                result = e if isinstance(e, Exception) else RuntimeError("cancelled")
+            slots.release()
+            yield link, result
+            if should_stop and should_stop():
+                break
+    finally:
+        halt.set()
+        feeder.join()
+        io_pool.shutdown(wait=True, cancel_futures=True)
+        cpu_pool.shutdown(wait=True, cancel_futures=True)
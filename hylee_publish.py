@@ -0,0 +1,196 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
+from hylee_cache import atomic_write
+from hylee_search import by_prefix, patch_year, prefix_filename, year_postings
+from hylee_shards import load_shard
+
+# PUBLISH MODE: what the userscript downloads. The working shards stay as they
+# are (indented, easy to diff); publish/ gets minified copies, optional per-month
+# sub-shards and .gz/.br precompressed variants, plus a manifest:
+#   publish/hyena_2004.json(.gz|.br)
+#   publish/2004/hyena_2004-05.json(.gz|.br)     (--months)
+#   publish/day/05-03.json(.gz|.br)             {"2004": [...], "2005": [...]}
+#   publish/search/po.json(.gz|.br)             (see hylee_search)
+#   publish/manifest.json  {"files": {"hyena_2004.json": {"bytes", "sha256", "gz", "br", "days"}}}
+PUBLISH_DIR = "publish"
+MANIFEST_FILE = "manifest.json"
+
+
+def minify(data):
+    return json.dumps(dict(sorted(data.items())), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _brotli():
+    # Optional: without the brotli package only .gz variants are written
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def load_manifest(out_dir=PUBLISH_DIR):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def save_manifest(manifest, out_dir=PUBLISH_DIR):
+    manifest["generated"] = datetime.datetime.now().isoformat(timespec="seconds")
+    manifest["files"] = dict(sorted(manifest["files"].items()))
+    atomic_write(os.path.join(out_dir, MANIFEST_FILE),
+                 json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+
+
+def emit(out_dir, name, payload, manifest, brotli=None, **extra):
+    # Writes one published file and its precompressed variants. Files whose
+    # bytes did not change are left alone, so their mtimes (and HTTP caches)
+    # survive a republish. Returns True when anything was written.
+    digest = hashlib.sha256(payload).hexdigest()
+    path = os.path.join(out_dir, name)
+    old = manifest["files"].get(name)
+    variants = [path, path + ".gz"] + ([path + ".br"] if brotli else [])
+    if old and old.get("sha256") == digest and all(os.path.exists(p) for p in variants):
+        old.update(extra)
+        return False
+
+    entry = {"bytes": len(payload), "sha256": digest}
+    atomic_write(path, payload)
+    packed = gzip.compress(payload, compresslevel=9, mtime=0)
+    atomic_write(path + ".gz", packed)
+    entry["gz"] = len(packed)
+    if brotli:
+        packed = brotli.compress(payload, quality=11)
+        atomic_write(path + ".br", packed)
+        entry["br"] = len(packed)
+    elif os.path.exists(path + ".br"):
+        os.remove(path + ".br") # Stale: would no longer match the .json
+    entry.update(extra)
+    manifest["files"][name] = entry
+    return True
+
+
+def month_shards(data):
+    # {"2004-05-03": [...]} -> {"2004-05": {"2004-05-03": [...]}}
+    months = {}
+    for date_str, bullets in data.items():
+        months.setdefault(date_str[:7], {})[date_str] = bullets
+    return months
+
+
+def publish_year(year, data, out_dir=PUBLISH_DIR, months=False, manifest=None, brotli=None):
+    # Returns how many files were (re)written
+    written = int(emit(out_dir, f"hyena_{year}.json", minify(data), manifest, brotli, days=len(data)))
+    if months:
+        for month, month_data in sorted(month_shards(data).items()):
+            name = f"{year}/hyena_{month}.json"
+            written += emit(out_dir, name, minify(month_data), manifest, brotli, days=len(month_data))
+    return written
+
+
+# ON THIS DAY: one small file per calendar date (MM-DD) holding that date's
+# bullets from every year, so the userscript makes one fetch instead of 24.
+# 02-29 is included. The manifest remembers the hash of each year it was built
+# from ("day_sources"); a changed shard only patches its own year into the 366
+# files, and files whose bytes did not change are not rewritten.
+DAY_KEYS = [(datetime.date(2004, 1, 1) + datetime.timedelta(days=i)).strftime("%m-%d") for i in range(366)]
+
+
+def day_filename(mm_dd):
+    return f"day/{mm_dd}.json"
+
+
+def load_day(out_dir, mm_dd):
+    try:
+        with open(os.path.join(out_dir, day_filename(mm_dd)), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def index_year_days(year, data, out_dir=PUBLISH_DIR, manifest=None, brotli=None):
+    # Patches one year into the day files. Returns how many files were rewritten.
+    digest = hashlib.sha256(minify(data)).hexdigest()
+    sources = manifest.setdefault("day_sources", {})
+    if sources.get(str(year)) == digest:
+        return 0
+
+    by_day = {date_str[5:]: bullets for date_str, bullets in data.items()}
+    written = 0
+    for mm_dd in DAY_KEYS:
+        entry = load_day(out_dir, mm_dd)
+        if mm_dd in by_day:
+            entry[str(year)] = by_day[mm_dd]
+        else:
+            entry.pop(str(year), None)
+        written += emit(out_dir, day_filename(mm_dd), minify(entry), manifest, brotli, years=len(entry))
+    sources[str(year)] = digest
+    return written
+
+
+def load_prefix(out_dir, prefix):
+    try:
+        with open(os.path.join(out_dir, prefix_filename(prefix)), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def index_year_terms(year, data, out_dir=PUBLISH_DIR, manifest=None, brotli=None):
+    # Swaps one year's postings into the search files. Only the prefix files
+    # that held the year before or hold it now are touched; the manifest keeps
+    # the list of prefixes per year ("search_sources").
+    digest = hashlib.sha256(minify(data)).hexdigest()
+    sources = manifest.setdefault("search_sources", {})
+    old = sources.get(str(year), {})
+    if old.get("sha256") == digest:
+        return 0
+
+    grouped = by_prefix(year_postings(data))
+    written = 0
+    for prefix in sorted(set(old.get("prefixes", [])) | set(grouped)):
+        terms = patch_year(load_prefix(out_dir, prefix), year, grouped.get(prefix, {}))
+        name = prefix_filename(prefix)
+        if terms:
+            written += emit(out_dir, name, minify(terms), manifest, brotli, terms=len(terms))
+        else:
+            for path in (name, name + ".gz", name + ".br"):
+                if os.path.exists(os.path.join(out_dir, path)):
+                    os.remove(os.path.join(out_dir, path))
+            manifest["files"].pop(name, None)
+    sources[str(year)] = {"sha256": digest, "prefixes": sorted(grouped)}
+    return written
+
+
+def update_indexes(year, data, out_dir=PUBLISH_DIR):
+    # Hook for the batch writers: call after a shard has been written
+    manifest = load_manifest(out_dir)
+    brotli = _brotli()
+    written = index_year_days(year, data, out_dir, manifest, brotli)
+    written += index_year_terms(year, data, out_dir, manifest, brotli)
+    save_manifest(manifest, out_dir)
+    return written
+
+
+def publish(years, out_dir=PUBLISH_DIR, months=False, load_year=load_shard):
+    # Publishes the stored days of `years` (JSON shards unless another store's
+    # load_year is given). Returns (manifest, files written).
+    brotli = _brotli()
+    manifest = load_manifest(out_dir)
+    written = 0
+    for year in years:
+        data = load_year(year)
+        if data:
+            written += publish_year(year, data, out_dir, months, manifest, brotli)
+            written += index_year_days(year, data, out_dir, manifest, brotli)
+            written += index_year_terms(year, data, out_dir, manifest, brotli)
+    save_manifest(manifest, out_dir)
+    return manifest, written
@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import threading
+from collections import Counter
+
+# HYLEE_RULES lets worker processes pick up a --rules override from the parent
+RULES_FILE = os.environ.get(
+    "HYLEE_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "hylee_rules.json")
+)
+
+# Priority when several rules match one bullet:
+#   kill -> end the page, drop the bullet
+#   drop -> skip the bullet, keep going
+#   stop -> keep the bullet, then end the page (weather line)
+ACTIONS = ("kill", "drop", "stop")
+
+
+class RuleSet:
+    # One era's kill-switches and filters, compiled into a single alternation
+    # regex so a bullet is classified in one pass instead of a dozen scans.
+    def __init__(self, rules):
+        self.rules = sorted(rules, key=lambda r: ACTIONS.index(r["action"]))
+        parts = []
+        for i, rule in enumerate(self.rules):
+            pattern = re.escape(rule["text"])
+            if not rule.get("case_sensitive"):
+                pattern = f"(?i:{pattern})"
+            if rule.get("match") == "prefix":
+                pattern = r"\A" + pattern
+            parts.append(f"(?P<r{i}>{pattern})")
+        self.matcher = re.compile("|".join(parts)) if parts else None
+        self.hits = Counter()
+        self.lock = threading.Lock()
+
+    def classify(self, bullet):
+        # Returns "kill", "drop", "stop" or None, and counts the rule that fired
+        if self.matcher is None:
+            return None
+        best = None
+        for m in self.matcher.finditer(bullet):
+            idx = int(m.lastgroup[1:])
+            if best is None or idx < best:
+                best = idx
+                if self.rules[idx]["action"] == "kill":
+                    break
+        if best is None:
+            return None
+        rule = self.rules[best]
+        with self.lock:
+            self.hits[rule["name"]] += 1
+        return rule["action"]
+
+
+class RuleBook:
+    # Per-era rule sets from hylee_rules.json, each compiled once
+    def __init__(self, config):
+        self.eras = []
+        for era in config["eras"]:
+            self.eras.append((era.get("from", 0), era.get("to", 9999), RuleSet(era["rules"])))
+        self.pooled = Counter()
+        self.lock = threading.Lock()
+
+    def for_year(self, year=None):
+        if year is not None:
+            for start, end, rules in self.eras:
+                if start <= int(year) <= end:
+                    return rules
+        return self.eras[0][2]
+
+    def add_hits(self, hits):
+        # Folds in counters reported back by worker processes
+        with self.lock:
+            self.pooled.update(hits)
+
+    def take_hits(self):
+        # Returns and clears the hit counters of every era
+        with self.lock:
+            total = Counter(self.pooled)
+            self.pooled.clear()
+        for _, _, rules in self.eras:
+            with rules.lock:
+                total.update(rules.hits)
+                rules.hits.clear()
+        return total
+
+
+_rulebook = None
+_rulebook_lock = threading.Lock()
+
+
+def load_rulebook(path=None):
+    # Loaded and compiled once per process
+    global _rulebook
+    with _rulebook_lock:
+        if _rulebook is None or path:
+            with open(path or RULES_FILE, 'r', encoding='utf-8') as f:
+                _rulebook = RuleBook(json.load(f))
+        return _rulebook
@@ -0,0 +1,161 @@
+import datetime
+import json
+import os
+import re
+import unicodedata
+
+from hylee_shards import load_shard
+
+# FULL-TEXT SEARCH over every bullet of every shard.
+# Terms are folded (lowercase, diacritics stripped: "počasí" -> "pocasi") and
+# filed by their first two characters, so a client looks up one small file:
+#   publish/search/po.json  {"pocasi": {"2004": [d, d, d...], "2005": [...]}}
+# Postings are per year and delta-encoded. A document number is
+#   (day of year - 1) * DOC_STRIDE + position of the bullet in that day
+# and each list holds the first number followed by the gaps between numbers.
+SEARCH_DIR = "search"
+DOC_STRIDE = 1024
+MIN_TERM = 2
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    decomposed = unicodedata.normalize('NFD', text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(fold(text)) if len(t) >= MIN_TERM]
+
+
+def term_prefix(term):
+    # File key for a folded term; anything outside a-z0-9 goes to "_"
+    return "".join(c if c.isascii() and c.isalnum() else "_" for c in term[:2])
+
+
+def prefix_filename(prefix):
+    return f"{SEARCH_DIR}/{prefix}.json"
+
+
+def doc_number(date_str, position):
+    day = datetime.date.fromisoformat(date_str).timetuple().tm_yday
+    return (day - 1) * DOC_STRIDE + position
+
+
+def doc_location(year, number):
+    # Inverse of doc_number: (date string, bullet position)
+    day, position = divmod(number, DOC_STRIDE)
+    date = datetime.date(int(year), 1, 1) + datetime.timedelta(days=day)
+    return date.isoformat(), position
+
+
+def delta_encode(numbers):
+    out = []
+    last = 0
+    for n in numbers:
+        out.append(n - last)
+        last = n
+    return out
+
+
+def delta_decode(gaps):
+    out = []
+    last = 0
+    for gap in gaps:
+        last += gap
+        out.append(last)
+    return out
+
+
+def year_postings(data):
+    # {"2004-05-03": [bullets]} -> {term: [doc numbers, ascending]}
+    postings = {}
+    for date_str, bullets in sorted(data.items()):
+        for position, bullet in enumerate(bullets[:DOC_STRIDE]):
+            number = doc_number(date_str, position)
+            for term in set(tokenize(bullet)):
+                postings.setdefault(term, []).append(number)
+    return postings
+
+
+def by_prefix(postings):
+    grouped = {}
+    for term, numbers in postings.items():
+        grouped.setdefault(term_prefix(term), {})[term] = delta_encode(sorted(numbers))
+    return grouped
+
+
+def patch_year(terms, year, year_terms):
+    # One prefix file with `year` swapped for its new postings
+    year = str(year)
+    patched = {}
+    for term, years in terms.items():
+        years = {y: gaps for y, gaps in years.items() if y != year}
+        if years:
+            patched[term] = years
+    for term, gaps in year_terms.items():
+        patched.setdefault(term, {})[year] = gaps
+    return {term: dict(sorted(years.items())) for term, years in sorted(patched.items())}
+
+
+class SearchIndex:
+    # Query side. Reads prefix files from a publish directory on demand and
+    # resolves hits against the working shards (or another store's load_year).
+    # Every query term must match (AND); a trailing * makes a term a prefix
+    # match ("pocas*").
+    def __init__(self, out_dir="publish", load_year=load_shard):
+        self.out_dir = out_dir
+        self.load_year = load_year
+        self.files = {}
+        self.shards = {}
+
+    def available(self):
+        return os.path.isdir(os.path.join(self.out_dir, SEARCH_DIR))
+
+    def _terms(self, prefix):
+        if prefix not in self.files:
+            try:
+                with open(os.path.join(self.out_dir, prefix_filename(prefix)), 'r', encoding='utf-8') as f:
+                    self.files[prefix] = json.load(f)
+            except (OSError, ValueError):
+                self.files[prefix] = {}
+        return self.files[prefix]
+
+    def lookup(self, token):
+        # Set of (year, doc number) for one query token
+        wildcard = token.endswith('*')
+        term = fold(token.rstrip('*'))
+        if len(term) < MIN_TERM:
+            return set()
+        terms = self._terms(term_prefix(term))
+        matched = [t for t in terms if t.startswith(term)] if wildcard else [term] if term in terms else []
+        docs = set()
+        for t in matched:
+            for year, gaps in terms[t].items():
+                docs.update((year, n) for n in delta_decode(gaps))
+        return docs
+
+    def search(self, query, limit=50):
+        # Returns [(date, bullet)], newest first
+        tokens = [t for t in query.split() if t.strip('*')]
+        if not tokens:
+            return []
+        hits = None
+        for token in tokens:
+            docs = self.lookup(token)
+            hits = docs if hits is None else hits & docs
+            if not hits:
+                return []
+
+        results = []
+        for year, number in sorted(hits, reverse=True):
+            date_str, position = doc_location(year, number)
+            if year not in self.shards:
+                self.shards[year] = self.load_year(year)
+            bullets = self.shards[year].get(date_str, [])
+            if position < len(bullets):
+                results.append((date_str, bullets[position]))
+            if limit and len(results) >= limit:
+                break
+        return results
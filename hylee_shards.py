@@ -0,0 +1,296 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+from collections import namedtuple
+
+from hylee_cache import atomic_write
+
+DATE_RE = re.compile(r'(\d{2})(\d{2})(\d{2})pes')
+
+
+def link_date(link):
+    match = DATE_RE.search(link)
+    if not match:
+        return None
+    return f"20{match.group(1)}-{match.group(2)}-{match.group(3)}"
+
+
+def link_year(link):
+    match = DATE_RE.search(link)
+    return 2000 + int(match.group(1)) if match else None
+
+
+def shard_filename(year):
+    return f"hyena_{year}.json"
+
+
+def load_shard(year):
+    # Returns {} when the shard does not exist yet or cannot be read
+    try:
+        with open(shard_filename(year), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def pending_links(links, shard):
+    # INCREMENTAL MODE: only the calendar days the shard does not hold yet.
+    # Failed fetches and 0-bullet days are never written to a shard, so they are
+    # picked up here as well.
+    return [link for link in links if link_date(link) not in shard]
+
+
+def merge_days(shard, new_days):
+    merged = dict(shard)
+    merged.update(new_days)
+    return dict(sorted(merged.items()))
+
+
+# CHANGE DETECTION: every day gets a content hash (date + whitespace-normalized
+# bullets) and every shard a digest over its day hashes, kept in a sidecar:
+#   hyena_manifest.json  {"2004": {"digest": ..., "bytes": ..., "days": {"2004-01-02": hash}}}
+# A shard whose digest did not change is not rewritten, so its mtime, ETag and
+# the userscript's HTTP cache survive the run. A shard on disk that the manifest
+# has no entry for is hashed and serves as the baseline instead.
+SHARD_MANIFEST = "hyena_manifest.json"
+
+ShardDiff = namedtuple("ShardDiff", "added changed removed")
+
+
+def day_hash(date_str, bullets):
+    text = date_str + "\n" + "\n".join(" ".join(b.split()) for b in bullets)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def day_hashes(data):
+    return {date_str: day_hash(date_str, bullets) for date_str, bullets in sorted(data.items())}
+
+
+def shard_digest(hashes):
+    lines = "".join(f"{date_str}:{h}\n" for date_str, h in sorted(hashes.items()))
+    return hashlib.sha256(lines.encode('utf-8')).hexdigest()
+
+
+def diff_days(old, new):
+    # old/new: {date: hash} -> ShardDiff of sorted date lists
+    return ShardDiff(
+        sorted(d for d in new if d not in old),
+        sorted(d for d in new if d in old and old[d] != new[d]),
+        sorted(d for d in old if d not in new),
+    )
+
+
+def describe_diff(diff, limit=20):
+    # "+3 ~1 -0; added: 2004-01-02, ..." for logs. Lists longer than `limit`
+    # (a brand new shard) are cut short.
+    parts = [f"+{len(diff.added)} ~{len(diff.changed)} -{len(diff.removed)}"]
+    for label, dates in (("added", diff.added), ("changed", diff.changed), ("removed", diff.removed)):
+        if dates:
+            more = f" ... (+{len(dates) - limit} more)" if len(dates) > limit else ""
+            parts.append(f"{label}: {', '.join(dates[:limit])}{more}")
+    return "; ".join(parts)
+
+
+def load_shard_manifest():
+    try:
+        with open(SHARD_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def disk_entry(year):
+    # Manifest entry for the shard on disk, or {} when there is none. Used for a
+    # shard the manifest does not know yet (written before the manifest existed,
+    # or copied in by hand), so the first write diffs against what is there.
+    filename = shard_filename(year)
+    if not os.path.exists(filename):
+        return {}
+    hashes = day_hashes(load_shard(year))
+    return {"digest": shard_digest(hashes), "bytes": os.path.getsize(filename), "days": hashes}
+
+
+def encode_shard(data):
+    return json.dumps(dict(sorted(data.items())), ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def save_shard_manifest(manifest):
+    atomic_write(SHARD_MANIFEST, json.dumps(dict(sorted(manifest.items())), indent=1).encode('utf-8'))
+
+
+def write_shard(year, data):
+    # Compaction target: temp file + rename, so readers (and the userscript) never
+    # see a half-written shard. Returns the ShardDiff against the last write, or
+    # None when nothing changed and the file was left alone.
+    manifest = load_shard_manifest()
+    hashes = day_hashes(data)
+    digest = shard_digest(hashes)
+    filename = shard_filename(year)
+
+    old = manifest.get(str(year))
+    if old is None:
+        old = disk_entry(year)
+        if old.get("digest") == digest:
+            with open(filename, 'rb') as f:
+                same = f.read() == encode_shard(data)
+            if same:
+                # Same days in the same bytes: only the manifest learns the shard
+                manifest[str(year)] = old
+                save_shard_manifest(manifest)
+                return None
+    elif old.get("digest") == digest and os.path.exists(filename) and os.path.getsize(filename) == old.get("bytes"):
+        return None
+
+    payload = encode_shard(data)
+    atomic_write(filename, payload)
+    manifest[str(year)] = {"digest": digest, "bytes": len(payload), "days": hashes}
+    save_shard_manifest(manifest)
+    return diff_days(old.get("days", {}), hashes)
+
+
+# OFFLINE READS: a date -> byte range index over a shard, so one day can be
+# decoded without parsing the whole year. write_shard puts every day on its own
+# line at indent 2 ('  "2004-05-03": ['), and JSON escapes newlines inside
+# strings, so a line that starts that way is always a top-level key. The file is
+# mapped only while it is scanned or a day is sliced out of it, so a batch can
+# still replace the shard underneath (Windows refuses to replace a mapped file).
+# Anchoring on the newline instead of re.MULTILINE's ^ scans about 10x faster.
+DAY_KEY_RE = re.compile(rb'\n  "(\d{4}-\d{2}-\d{2})": ')
+
+
+class ShardReader:
+    def __init__(self, year):
+        self.path = shard_filename(year)
+        self.stamp = None
+        self.offsets = {}
+        self.fallback = None # Shards in another layout are loaded whole
+
+    def _map(self):
+        with open(self.path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def refresh(self):
+        # Rebuilds the index when the shard changed on disk. False if it is gone.
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.stamp, self.offsets, self.fallback = None, {}, None
+            return False
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self.stamp:
+            return True
+        self.stamp, self.offsets, self.fallback = stamp, {}, None
+        if not st.st_size:
+            return True
+        with self._map() as mm:
+            keys = [(m.group(1).decode('ascii'), m.start(), m.end()) for m in DAY_KEY_RE.finditer(mm)]
+            end = mm.rfind(b'}')
+        for i, (date_str, _, value_start) in enumerate(keys):
+            self.offsets[date_str] = (value_start, keys[i + 1][1] if i + 1 < len(keys) else end)
+        if not self.offsets:
+            self.fallback = load_shard(self.path[6:10])
+        return True
+
+    def dates(self):
+        if not self.refresh():
+            return []
+        return sorted(self.fallback) if self.fallback is not None else sorted(self.offsets)
+
+    def day(self, date_str):
+        # Bullets of one day, or None
+        if not self.refresh():
+            return None
+        if self.fallback is not None:
+            return self.fallback.get(date_str)
+        span = self.offsets.get(date_str)
+        if span is None:
+            return None
+        with self._map() as mm:
+            raw = mm[span[0]:span[1]]
+        try:
+            return json.loads(raw.rstrip().rstrip(b',').decode('utf-8'))
+        except ValueError:
+            # Not the layout write_shard produces after all: read it whole from now on
+            self.fallback = load_shard(self.path[6:10])
+            return self.fallback.get(date_str)
+
+
+class ShardJournal:
+    # Write-ahead log for one year of a batch run. Every day is appended as one
+    # JSONL record the moment it is parsed:
+    #   {"date": "2004-05-03", "bullets": [...]}   (null = failed fetch)
+    # A crash or STOP therefore loses at most the day in flight, and replay()
+    # tells a resumed run which days are already done. A failed fetch is not
+    # done: the resumed run tries that day again.
+    def __init__(self, year):
+        self.year = year
+        self.path = f"hyena_{year}.journal.jsonl"
+        self.f = None
+
+    def replay(self):
+        days = {}
+        processed = set()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # Torn last line from a crash
+                    if record.get("bullets") is not None:
+                        processed.add(record["date"])
+                    if record.get("bullets"):
+                        days[record["date"]] = record["bullets"]
+        except OSError:
+            pass
+        return days, processed
+
+    def open(self, resume=False):
+        torn = False
+        if resume and os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        self.f = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if torn:
+            self.f.write("\n")
+
+    def append(self, date_str, bullets):
+        self.f.write(json.dumps({"date": date_str, "bullets": bullets}, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# RUN STATE: which years a batch run covers and which are already compacted.
+# Lives next to the shards until the run completes.
+RUN_STATE_FILE = "hylee_run.json"
+
+
+def load_run_state():
+    try:
+        with open(RUN_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_run_state(state):
+    atomic_write(RUN_STATE_FILE, json.dumps(state, indent=1).encode('utf-8'))
+
+
+def clear_run_state():
+    if os.path.exists(RUN_STATE_FILE):
+        os.remove(RUN_STATE_FILE)
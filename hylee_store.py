@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import threading
+import time
+
+from hylee_shards import ShardReader, load_shard, shard_filename, write_shard, day_hashes, diff_days
+
+# STORAGE BACKENDS for the yearly day -> bullets data. Both share one interface:
+#   load_year(year)                -> {"2004-05-03": [bullets], ...}
+#   load_day(date_str)             -> [bullets] or None, without loading the year
+#   list_days(year)                -> sorted dates the year holds
+#   save_year(year, data, changed) -> data is the full year; `changed` optionally
+#                                     lists the new/updated days, so a backend
+#                                     that can upsert writes only those. Returns
+#                                     a ShardDiff, or None when nothing changed.
+#   years()                        -> years that hold at least one day
+# "json" keeps the hyena_YYYY.json shards as the source of truth. "sqlite" keeps
+# everything in one WAL-mode database and produces the shards with export_shards().
+STORES = ("json", "sqlite")
+DB_FILE = "hylee.db"
+
+
+class JsonStore:
+    name = "json"
+
+    def __init__(self):
+        # One byte-offset index per shard, rebuilt when the file changes
+        self.readers = {}
+
+    def _reader(self, year):
+        year = int(year)
+        if year not in self.readers:
+            self.readers[year] = ShardReader(year)
+        return self.readers[year]
+
+    def load_year(self, year):
+        return load_shard(year)
+
+    def load_day(self, date_str):
+        return self._reader(date_str[:4]).day(date_str)
+
+    def list_days(self, year):
+        return self._reader(year).dates()
+
+    def save_year(self, year, data, changed=None):
+        return write_shard(year, data)
+
+    def years(self):
+        return sorted(int(f[6:10]) for f in os.listdir('.')
+                      if f.startswith("hyena_") and f.endswith(".json") and f[6:10].isdigit())
+
+    def describe(self, year):
+        return shard_filename(year)
+
+    def close(self):
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY,
+    year INTEGER NOT NULL,
+    updated INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS days_year ON days (year);
+CREATE TABLE IF NOT EXISTS bullets (
+    date TEXT NOT NULL REFERENCES days (date) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (date, position)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteStore:
+    # One row per day plus one row per bullet, keyed (date, position) so a day
+    # reads with a single index range scan. WAL mode lets the GUI explorer read
+    # while a batch thread writes. Every thread gets its own connection.
+    name = "sqlite"
+    BATCH_DAYS = 200 # Days per write transaction
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        db = self._db()
+        db.executescript(SCHEMA)
+
+    def _db(self):
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            self.local.db = db
+            with self.lock:
+                self.connections.append(db)
+        return db
+
+    def load_year(self, year):
+        rows = self._db().execute(
+            "SELECT b.date, b.text FROM days d JOIN bullets b ON b.date = d.date "
+            "WHERE d.year = ? ORDER BY b.date, b.position", (int(year),))
+        data = {}
+        for date_str, text in rows:
+            data.setdefault(date_str, []).append(text)
+        return data
+
+    def load_day(self, date_str):
+        rows = self._db().execute(
+            "SELECT text FROM bullets WHERE date = ? ORDER BY position", (date_str,)).fetchall()
+        return [text for (text,) in rows] or None
+
+    def list_days(self, year):
+        return [d for (d,) in self._db().execute("SELECT date FROM days WHERE year = ? ORDER BY date", (int(year),))]
+
+    def upsert_days(self, days):
+        # Per-day upserts, BATCH_DAYS to a transaction
+        db = self._db()
+        items = sorted(days.items())
+        now = int(time.time())
+        for start in range(0, len(items), self.BATCH_DAYS):
+            with db:
+                for date_str, bullets in items[start:start + self.BATCH_DAYS]:
+                    db.execute(
+                        "INSERT INTO days (date, year, updated) VALUES (?, ?, ?) "
+                        "ON CONFLICT (date) DO UPDATE SET updated = excluded.updated",
+                        (date_str, int(date_str[:4]), now))
+                    db.execute("DELETE FROM bullets WHERE date = ?", (date_str,))
+                    db.executemany(
+                        "INSERT INTO bullets (date, position, text) VALUES (?, ?, ?)",
+                        [(date_str, i, text) for i, text in enumerate(bullets)])
+
+    def save_year(self, year, data, changed=None):
+        # Full replace unless `changed` is given; either way only the days whose
+        # content hash differs from the stored one are touched
+        stored = self.load_year(year)
+        if changed is None:
+            target = data
+        else:
+            target = dict(stored)
+            target.update({d: data[d] for d in changed if d in data})
+        diff = diff_days(day_hashes(stored), day_hashes(target))
+        if not any(diff):
+            return None
+        if diff.removed:
+            with self._db() as db:
+                db.executemany("DELETE FROM days WHERE date = ?", [(d,) for d in diff.removed])
+        self.upsert_days({d: target[d] for d in diff.added + diff.changed})
+        return diff
+
+    def years(self):
+        return [y for (y,) in self._db().execute("SELECT DISTINCT year FROM days ORDER BY year")]
+
+    def describe(self, year):
+        return f"{self.path} ({year})"
+
+    def close(self):
+        with self.lock:
+            for db in self.connections:
+                db.close()
+            self.connections = []
+        self.local = threading.local()
+
+
+def open_store(kind="json", path=DB_FILE):
+    if kind == "sqlite":
+        return SqliteStore(path)
+    return JsonStore()
+
+
+def export_shards(store, years=None):
+    # Writes hyena_YYYY.json from any backend in the exact shard format the
+    # userscript reads. Returns {year: days written}.
+    written = {}
+    for year in (years if years is not None else store.years()):
+        data = store.load_year(year)
+        if data and write_shard(year, data) is not None:
+            written[year] = len(data)
+    return written
+
+
+def import_shards(store, years):
+    # The other direction: loads existing JSON shards into `store`
+    imported = {}
+    for year in years:
+        data = load_shard(year)
+        if data:
+            store.save_year(year, data)
+            imported[year] = len(data)
+    return imported
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import time
+
+from hylee_cache import atomic_write
+from hylee_calendar import scan_archive
+from hylee_extract import decode_html
+from hylee_shards import link_date, merge_days, pending_links
+
+# WATCH MODE: keeps the live shard (every year archive_map serves from "/", the
+# front page) fresh without re-crawling the year. A poll is one conditional GET
+# of the front page; a 304, or a body whose hash did not change, ends it. When
+# the page did change, its daily links are rescanned and only new days plus the
+# newest `recheck` days (the ones the site still edits) are fetched, each with
+# its own conditional GET through the page cache. Only pages whose bytes changed
+# are extracted, and the shard is updated through the store. Between polls the
+# watcher holds nothing but the small state below, so an idle daemon stays flat.
+#   hylee_watch.json  {"etag", "last_modified", "sha256", "latest", "polled"}
+# A catch-up pass (at start, or alone with --catch-up) ignores the saved
+# validators and also fetches every day the shard is missing and every day from
+# the newest one seen before the downtime onwards.
+WATCH_STATE_FILE = "hylee_watch.json"
+LIVE_PATH = "/"
+
+
+class LiveWatcher:
+    def __init__(self, scraper, store, recheck=2, workers=4, state_path=WATCH_STATE_FILE):
+        self.scraper = scraper
+        self.store = store
+        self.recheck = max(0, recheck)
+        self.workers = workers
+        self.state_path = state_path
+        self.years = sorted(y for y, path in scraper.archive_map.items() if path == LIVE_PATH)
+        self.state = self.load_state()
+
+    def load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def save_state(self):
+        atomic_write(self.state_path, json.dumps(self.state, indent=1).encode('utf-8'))
+
+    def poll(self, catch_up=False):
+        # Returns [(year, data, diff)] for every shard that changed, and the
+        # number of days that could not be fetched
+        validators = {} if catch_up else self.state
+        r = self.scraper.fetch_conditional(LIVE_PATH, validators.get("etag"), validators.get("last_modified"))
+        if r.status_code == 304:
+            return [], 0
+        if r.status_code != 200:
+            raise RuntimeError(f"front page answered HTTP {r.status_code}")
+
+        digest = hashlib.sha256(r.content).hexdigest()
+        if digest == self.state.get("sha256") and not catch_up:
+            return [], 0
+
+        by_year = scan_archive(decode_html(r.content))
+        self.scraper.calendar.store(f"{self.scraper.base_url}{LIVE_PATH}", by_year)
+
+        changes = []
+        failed = 0
+        dates = [self.state.get("latest") or ""]
+        for year in self.years:
+            links = by_year.get(str(year), [])
+            if not links:
+                continue
+            dates.append(link_date(links[-1]))
+            change, year_failed = self.refresh_year(year, links, catch_up)
+            failed += year_failed
+            if change:
+                changes.append(change)
+
+        # A poll with failed days keeps the old validators, so the next poll
+        # sees the page as changed and retries them
+        if not failed:
+            self.state = {
+                "etag": r.headers.get('ETag'),
+                "last_modified": r.headers.get('Last-Modified'),
+                "sha256": digest,
+                "latest": max(dates),
+                "polled": int(time.time()),
+            }
+            self.save_state()
+        return changes, failed
+
+    def refresh_year(self, year, links, catch_up):
+        existing = self.store.load_year(year)
+        work = set(pending_links(links, existing))
+        if self.recheck:
+            work.update(links[-self.recheck:])
+        latest = self.state.get("latest")
+        if catch_up and latest:
+            work.update(link for link in links if link_date(link) >= latest)
+
+        # Pages that come back byte-identical to the cached copy are not extracted again
+        known = {link: self.cached_sha(link) for link in work if link_date(link) in existing}
+        updates = {}
+        failed = 0
+        for link, content in self.scraper.fetch_many(sorted(work), workers=self.workers):
+            if content is None:
+                self.scraper.log_day(link, None)
+                failed += 1
+                continue
+            if known.get(link) and hashlib.sha256(content).hexdigest() == known[link]:
+                continue
+            bullets = self.scraper.extract_day(link, content)
+            self.scraper.log_day(link, bullets)
+            if bullets is None:
+                failed += 1
+            elif bullets:
+                updates[link_date(link)] = bullets
+
+        if not updates:
+            return None, failed
+        data = merge_days(existing, updates)
+        diff = self.store.save_year(year, data, changed=list(updates))
+        return ((year, data, diff) if diff else None), failed
+
+    def cached_sha(self, link):
+        cache = self.scraper.cache
+        entry = cache.lookup(f"{self.scraper.base_url}{link}") if cache else None
+        return entry["sha256"] if entry else None
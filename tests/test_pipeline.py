@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hylee_core import HyenaScraper
+
+FIXTURE_DIR = os.path.join(ROOT, "bench", "fixtures")
+PAGES = {
+    "/030415pes.htm": "030415pes-unclosed-li",
+    "/041102pes.htm": "041102pes-cp1250-br",
+    "/060310pes.htm": "060310pes-table-stop",
+}
+MISSING = "/050505pes.htm" # Answers 404
+
+
+def fake_fetch(link, urgent=False, should_stop=None):
+    # fetch_day without the network: fixture bytes, or None like a 404
+    if link not in PAGES:
+        return None
+    with open(os.path.join(FIXTURE_DIR, f"{PAGES[link]}.htm"), "rb") as f:
+        return f.read()
+
+
+def golden(link):
+    with open(os.path.join(FIXTURE_DIR, f"{PAGES[link]}.golden.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_scrape_many_pipeline_survives_a_failed_fetch():
+    scraper = HyenaScraper(log_callback=lambda msg: None)
+    scraper.cache = None
+    scraper.fetch_day = fake_fetch
+    links = ["/030415pes.htm", MISSING, "/041102pes.htm", "/060310pes.htm"]
+
+    results = list(scraper.scrape_many(links, workers=2, processes=2))
+
+    assert [link for link, _ in results] == links
+    for link, bullets in results:
+        if link == MISSING:
+            assert bullets is None
+        else:
+            assert bullets == golden(link)